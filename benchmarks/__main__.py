@@ -0,0 +1,70 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import platform
+import sys
+from . import bench_encoding, bench_protocol  # noqa: F401 (registers the benchmarks)
+from .harness import BENCHMARKS, run
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Decoder and encoder micro-benchmarks")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.5, help="approximate seconds spent timing each benchmark")
+    parser.add_argument("--save", metavar="PATH", help="write the results to a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results with a JSON baseline")
+    parser.add_argument("--max-slowdown", type=float, default=None, metavar="PERCENT",
+                        help="with --compare, exit with status 1 if any benchmark is slower than this")
+    return parser.parse_args()
+
+
+def _change(now: float, then: float) -> float:
+    return (now - then) / then * 100
+
+
+def main() -> int:
+    args = _parse_args()
+    names = sorted(name for name in BENCHMARKS if args.filter in name)
+    results = run(names, args.min_time)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    slower = []
+    print(f"{'benchmark':<36} {'ops/sec':>12} {'peak KiB':>10} {'retained KiB':>13} {'blocks':>8}  change")
+    for name, result in results.items():
+        line = (f"{name:<36} {result['ops_per_sec']:>12.1f} {result['peak_bytes'] / 1024:>10.1f} "
+                f"{result['retained_bytes'] / 1024:>13.1f} {result['retained_blocks']:>8}")
+        if name in baseline:
+            ops = _change(result["ops_per_sec"], baseline[name]["ops_per_sec"])
+            peak = _change(result["peak_bytes"], baseline[name]["peak_bytes"]) if baseline[name]["peak_bytes"] else 0
+            line += f"  {ops:+.1f}% ops/sec, {peak:+.1f}% peak"
+            if args.max_slowdown is not None and -ops > args.max_slowdown:
+                slower.append(name)
+        print(line)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if slower:
+        print(f"slower than the baseline by more than {args.max_slowdown}%: {', '.join(slower)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
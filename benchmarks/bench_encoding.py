@@ -0,0 +1,42 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from src.skytable_py.query import Query, Pipeline, UInt, SInt, encode_parameter
+from .harness import benchmark
+
+# a mix of every parameter type
+_PARAMS = [p for i in range(1000) for p in (f"user{i}", b"blob%d" % i, UInt(i), SInt(-i), i + 0.5, i % 2 == 0, None)]
+
+
+@benchmark("encode_parameter/mixed")
+def encode_mixed():
+    return lambda: [encode_parameter(p) for p in _PARAMS]
+
+
+@benchmark("query/new_many_params")
+def query_many_params():
+    return lambda: Query("insert into apps.users(?)", *_PARAMS)
+
+
+@benchmark("query/template_bind")
+def template_bind():
+    template = Query.template("insert into apps.users(?, ?, ?)")
+    return lambda: [template.bind(f"user{i}", UInt(i), i + 0.5) for i in range(1000)]
+
+
+@benchmark("pipeline/1000_queries")
+def pipeline():
+    queries = [Query("insert into apps.users(?, ?)", f"user{i}", UInt(i)) for i in range(1000)]
+    return lambda: Pipeline(*queries)
@@ -0,0 +1,100 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from src.skytable_py.protocol import Protocol
+from src.skytable_py.rows import tuple_row
+from .harness import benchmark
+
+
+def _string(s: bytes) -> bytes:
+    return b"\x0D%d\n%s" % (len(s), s)
+
+
+def _row(i: int) -> bytes:
+    return b"5\n" + _string(b"user%d" % i) + b"\x05%d\n\x09-%d\n\x0B%d.25\n\x01\x01" % (i, i, i)
+
+
+# a multi-row response with 10,000 rows of five mixed columns
+_ROWS = b"\x1310000\n" + b"".join(_row(i) for i in range(10_000))
+# 1,000 scalar responses, as returned for a pipeline
+_SCALARS = b"".join(b"\x05%d\n\x0B%d.5\n\x09-%d\n" % (i, i, i) + _string(b"value%d" % i) for i in range(250))
+_LONG_STRING = _string(b"x" * (1 << 20))
+_DEEP_LIST = b"\x0E1\n" * 500 + b"\x0E0\n"
+# a small multi-row response that is split at every byte
+_SPLIT = b"\x1316\n" + b"".join(_row(i) for i in range(16))
+
+
+def _parse_all(blob: bytes, count: int, **kwargs) -> object:
+    protocol = Protocol(blob, **kwargs)
+    for _ in range(count):
+        resp = protocol.parse()
+    return resp
+
+
+@benchmark("protocol.parse/scalars")
+def scalars():
+    return lambda: _parse_all(_SCALARS, 1000)
+
+
+@benchmark("protocol.parse/long_string")
+def long_string():
+    return lambda: _parse_all(_LONG_STRING, 1)
+
+
+@benchmark("protocol.parse/rows")
+def rows():
+    return lambda: _parse_all(_ROWS, 1)
+
+
+@benchmark("protocol.parse/rows_lazy")
+def rows_lazy():
+    return lambda: _parse_all(_ROWS, 1, lazy=True)
+
+
+@benchmark("protocol.parse/rows_tuple_factory")
+def rows_tuple_factory():
+    def op():
+        protocol = Protocol(_ROWS)
+        return protocol.parse(row_factory=tuple_row)
+    return op
+
+
+@benchmark("protocol.parse/deep_list")
+def deep_list():
+    return lambda: _parse_all(_DEEP_LIST, 1)
+
+
+@benchmark("protocol.parse/every_split")
+def every_split():
+    def op():
+        protocol = Protocol()
+        for i in range(1, len(_SPLIT)):
+            protocol.push_additional_bytes(_SPLIT[:i])
+            protocol.parse()
+            protocol.push_additional_bytes(_SPLIT[i:])
+            resp = protocol.parse()
+        return resp
+    return op
+
+
+@benchmark("protocol.parse/byte_at_a_time")
+def byte_at_a_time():
+    def op():
+        protocol = Protocol()
+        for i in range(len(_SPLIT)):
+            protocol.push_additional_bytes(_SPLIT[i:i + 1])
+            resp = protocol.parse()
+        return resp
+    return op
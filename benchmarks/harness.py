@@ -0,0 +1,79 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+# every registered benchmark, by name
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """
+    Register a benchmark. The decorated function does any setup and returns the operation to be timed, which is
+    called with no arguments.
+    """
+    def register(setup: Callable[[], Callable[[], object]]) -> Callable[[], Callable[[], object]]:
+        if name in BENCHMARKS:
+            raise ValueError(f"duplicate benchmark {name}")
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _time(op: Callable[[], object], min_time: float) -> float:
+    # grow the number of calls per round until a round takes long enough to time, then keep the best of 3 rounds
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 3:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(2):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _allocations(op: Callable[[], object]) -> Dict[str, int]:
+    # peak memory allocated during a single call, and what is still held once it returns (the result)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = op()
+        retained, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_bytes": peak, "retained_bytes": retained, "retained_blocks": blocks}
+
+
+def run(names: List[str], min_time: float) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in names:
+        op = BENCHMARKS[name]()
+        op()  # warm up
+        seconds = _time(op, min_time)
+        results[name] = {"ops_per_sec": 1 / seconds, **_allocations(op)}
+    return results
@@ -14,5 +14,15 @@
 # limitations under the License.
 
 from .connection import Connection
-from .query import Query, UInt, SInt
+from .transport import BufferedConnection
+from .multiplex import MultiplexedConnection
+from .sync import SyncConnection
+from .query import Query, PreparedQuery, Pipeline, UInt, SInt
 from .config import Config
+from .pool import Pool
+from .metrics import Metrics
+from .cache import ResultCache
+from .hedging import HedgedPool
+from .balancer import BalancedPool
+from .reconnect import ReconnectingConnection
+from .rows import tuple_row, dict_row, namedtuple_row
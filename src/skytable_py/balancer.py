@@ -0,0 +1,167 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from time import perf_counter
+from typing import TYPE_CHECKING, Iterable, List, Sequence, Tuple, Union
+from .connection import _CONNECTION_ERRORS
+from .exception import ClientException
+from .pool import Pool
+from .query import Query, Pipeline
+from .response import Response
+from .rows import RowFactory
+
+if TYPE_CHECKING:
+    from .config import Config
+
+# weight of the latest latency in the moving average
+_EWMA_ALPHA = 0.2
+
+
+class _Endpoint:
+    __slots__ = ("config", "pool", "outstanding", "ewma", "down")
+
+    def __init__(self, config: "Config") -> None:
+        self.config = config
+        self.pool = None
+        self.outstanding = 0
+        # exponentially weighted moving average of query latency, in seconds
+        self.ewma = 0.0
+        self.down = False
+
+    def observe(self, latency: float) -> None:
+        self.ewma = latency if self.ewma == 0.0 else self.ewma + _EWMA_ALPHA * (latency - self.ewma)
+
+
+class BalancedPool:
+    """
+    Connection pools to several Skytable instances (see `Config`), with every query sent to one of them. Use
+    `Config.create_balanced_pool` to create one.
+
+    With the `least_outstanding` strategy, a query goes to the instance with the fewest queries in flight, breaking
+    ties by latency. With `ewma`, it goes to the instance with the lowest moving average latency.
+
+    An instance that can't be connected to, or whose connection fails during a query, is marked down and skipped.
+    Queries that failed to get a connection are retried on another instance, since they were never sent; a query
+    that fails after being sent raises. Instances that are down are probed every `probe_interval` seconds and
+    used again once they answer.
+    """
+
+    def __init__(self, configs: Sequence["Config"], strategy: str, probe_interval: float) -> None:
+        if strategy not in ("least_outstanding", "ewma"):
+            raise ClientException(f"unknown balancing strategy {strategy}")
+        self._endpoints = [_Endpoint(config) for config in configs]
+        self._strategy = strategy
+        self._probe_interval = probe_interval
+        self._prober = None
+
+    async def _open(self, min_size: int, max_size: int) -> None:
+        error = None
+        for endpoint in self._endpoints:
+            try:
+                endpoint.pool = await endpoint.config.create_pool(min_size, max_size)
+            except _CONNECTION_ERRORS as e:
+                endpoint.down = True
+                endpoint.pool = await endpoint.config.create_pool(0, max_size)
+                error = e
+        if all(endpoint.down for endpoint in self._endpoints):
+            raise error
+        self._prober = asyncio.ensure_future(self.__probe())
+
+    def get_endpoints(self) -> List[Tuple[str, int, bool]]:
+        """
+        Returns the host, port and whether the instance is up, for every instance
+        """
+        return [(e.config.get_host(), e.config.get_port(), not e.down) for e in self._endpoints]
+
+    def __choose(self, excluded: List[_Endpoint]) -> _Endpoint:
+        candidates = [e for e in self._endpoints if not e.down and e not in excluded]
+        if not candidates:
+            raise ClientException("no instances are available")
+        if self._strategy == "ewma":
+            return min(candidates, key=lambda e: e.ewma)
+        return min(candidates, key=lambda e: (e.outstanding, e.ewma))
+
+    async def __run(self, run) -> Union[Response, List[Response]]:
+        tried = []
+        while True:
+            endpoint = self.__choose(tried)
+            endpoint.outstanding += 1
+            sent = False
+            try:
+                async with endpoint.pool.acquire() as db:
+                    sent = True
+                    start = perf_counter()
+                    result = await run(db)
+                    endpoint.observe(perf_counter() - start)
+                    return result
+            except _CONNECTION_ERRORS:
+                endpoint.down = True
+                if sent:
+                    raise
+                tried.append(endpoint)
+            finally:
+                endpoint.outstanding -= 1
+
+    async def run_simple_query(self, query: Query, row_factory: Union[None, RowFactory] = None) -> Response:
+        return await self.__run(lambda db: db.run_simple_query(query, row_factory))
+
+    async def run_pipeline(self, pipeline: Union[Pipeline, Iterable[Query]],
+                           row_factory: Union[None, RowFactory] = None) -> List[Response]:
+        if not isinstance(pipeline, Pipeline):
+            pipeline = Pipeline(*pipeline)
+        return await self.__run(lambda db: db.run_pipeline(pipeline, row_factory))
+
+    async def __probe(self) -> None:
+        while True:
+            await asyncio.sleep(self._probe_interval)
+            for endpoint in self._endpoints:
+                if endpoint.down:
+                    try:
+                        endpoint.down = not await self.__is_reachable(endpoint)
+                    except Exception:
+                        # keep probing the other instances, and this one again next time
+                        pass
+
+    @staticmethod
+    async def __is_reachable(endpoint: _Endpoint) -> bool:
+        try:
+            db = await endpoint.config.connect()
+        except _CONNECTION_ERRORS + (ClientException,):
+            return False
+        try:
+            return await db._ping()
+        except _CONNECTION_ERRORS + (ClientException,):
+            return False
+        finally:
+            try:
+                await db.close()
+            except _CONNECTION_ERRORS:
+                pass
+
+    async def close(self) -> None:
+        if self._prober is not None:
+            self._prober.cancel()
+            await asyncio.wait((self._prober,))
+            self._prober = None
+        for endpoint in self._endpoints:
+            if endpoint.pool is not None:
+                await endpoint.pool.close()
+
+    async def __aenter__(self) -> "BalancedPool":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
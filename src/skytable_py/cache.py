@@ -0,0 +1,169 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from time import monotonic
+from typing import Any, Iterator, List, Tuple, Union
+from .query import Query, Pipeline
+from .response import Response
+
+# statement kinds: cacheable reads, writes to a model, statements that only report on the server, and the rest
+_READ, _WRITE, _REPORT, _OTHER = range(4)
+_REPORTING = re.compile(rb"\s*(?:sysctl\s+report|inspect|describe)\b", re.IGNORECASE)
+_SELECT = re.compile(rb"\s*select\b.*?\bfrom\s+([\w.]+)", re.IGNORECASE | re.DOTALL)
+_DML = re.compile(rb"\s*(?:(?:insert|upsert)\s+into|update|delete\s+from)\s+([\w.]+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _classify(text: bytes) -> Tuple[int, Union[None, str]]:
+    # the kind of a statement and the model it reads from or writes to
+    match = _SELECT.match(text)
+    if match is not None:
+        return _READ, match.group(1).decode().lower()
+    match = _DML.match(text)
+    if match is not None:
+        return _WRITE, match.group(1).decode().lower()
+    if _REPORTING.match(text) is not None:
+        return _REPORT, None
+    return _OTHER, None
+
+
+def _same_model(cached: str, model: str) -> bool:
+    # a name without a space (run after `use`) may refer to the model of that name in any space
+    if cached == model:
+        return True
+    if "." in cached and "." in model:
+        return False
+    return cached.rpartition(".")[2] == model.rpartition(".")[2]
+
+
+def _pipeline_statements(pipeline: Pipeline) -> Iterator[bytes]:
+    # walk the <query window>\n<params size>\n<query><params> frames of a pipeline
+    buffer = pipeline._buffer
+    i = 0
+    while i < len(buffer):
+        window_end = buffer.index(b"\n", i)
+        params_end = buffer.index(b"\n", window_end + 1)
+        window = int(buffer[i:window_end])
+        start = params_end + 1
+        yield bytes(buffer[start:start + window])
+        i = start + window + int(buffer[window_end + 1:params_end])
+
+
+def _key(query: Query, row_factory: Any) -> Tuple[bytes, int, Any]:
+    # responses built with different row factories are cached separately, so factories are compared by identity
+    return bytes(query._buffer), query._q_window, row_factory
+
+
+class _Entry:
+    __slots__ = ("response", "model", "expires_at")
+
+    def __init__(self, response: Response, model: str, expires_at: float) -> None:
+        self.response = response
+        self.model = model
+        self.expires_at = expires_at
+
+
+class ResultCache:
+    """
+    A cache for the responses to `select` queries, used by connections it's attached to (see
+    `Connection.set_result_cache`). Entries are keyed on the encoded query and its parameters.
+
+    - `max_entries`: once full, the least recently used entry is evicted
+    - `ttl`: seconds after which an entry expires, unless a different `ttl` is given for it
+
+    When a connection using the cache runs an `insert`, `upsert`, `update` or `delete`, every entry reading from the
+    same model is invalidated. Since the current space isn't tracked, a model named without its space (after `use`)
+    is taken to be the model of that name in any space. Statements that only report on the server (`sysctl report`, `inspect` and `describe`)
+    leave the cache alone, and any other statement that isn't a `select` (such as DDL or `use`) clears it. Changes
+    made by other clients aren't seen until entries expire.
+
+    Responses decoded with a row factory are cached per factory object. `dict_row` and `namedtuple_row` return the
+    same factory for the same column names, but a factory created some other way on every call never hits the
+    cache.
+
+    Cached responses are shared by every caller that gets them, so they must not be modified.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Union[None, float] = 60.0) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries: "OrderedDict[Any, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: Any) -> Union[None, Response]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at < monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.response
+
+    def _put(self, key: Any, model: str, response: Response, ttl: Union[None, float] = None) -> None:
+        ttl = self._ttl if ttl is None else ttl
+        expires_at = float("inf") if ttl is None else monotonic() + ttl
+        self._entries[key] = _Entry(response, model, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _statement_executed(self, text: bytes) -> None:
+        # drop the entries that a statement run through a connection may have changed
+        kind, model = _classify(text)
+        if kind == _WRITE:
+            self.invalidate_model(model)
+        elif kind == _OTHER:
+            self.clear()
+
+    def invalidate(self, query: Query) -> None:
+        """
+        Drop the entries for `query` (with its parameters)
+        """
+        for key in [key for key in self._entries if key[0] == bytes(query._buffer)]:
+            del self._entries[key]
+
+    def invalidate_model(self, model: str) -> None:
+        """
+        Drop every entry that reads from `model`, such as `apps.users`. If either the query or `model` leaves out the
+        space, the entry is dropped if the model names match.
+        """
+        model = model.lower()
+        stale: List[Any] = [key for key, entry in self._entries.items() if _same_model(entry.model, model)]
+        for key in stale:
+            del self._entries[key]
+
+    def invalidate_matching(self, pattern: str) -> None:
+        """
+        Drop every entry that reads from a model matching the glob `pattern`, such as `apps.*`
+        """
+        pattern = pattern.lower()
+        stale: List[Any] = [key for key, entry in self._entries.items() if fnmatchcase(entry.model, pattern)]
+        for key in stale:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
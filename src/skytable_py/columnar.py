@@ -0,0 +1,79 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+from typing import List, Union
+from .exception import ClientException
+
+
+def _new_column(value: Union[None, bool, int, float, bytes, str, list]) -> Union[array, list]:
+    # bools are ints too, so check the exact type
+    if type(value) is int:
+        return array("q")
+    elif type(value) is float:
+        return array("d")
+    return []
+
+
+class Columns:
+    """
+    A result set decoded into one container per column, as returned by `Connection.fetch_columns`.
+
+    Integer columns are stored in an `array.array` of 64-bit signed integers and float columns in an `array.array` of
+    doubles. Every other column, and any numeric column that contains nulls or doesn't fit in 64 bits, is a `list`.
+    """
+
+    def __init__(self) -> None:
+        self.columns: List[Union[array, list]] = []
+        self._row_count = 0
+
+    def get_row_count(self) -> int:
+        return self._row_count
+
+    def get_column_count(self) -> int:
+        return len(self.columns)
+
+    def column(self, index: int) -> Union[array, list]:
+        return self.columns[index]
+
+    def _append_row(self, row: list) -> None:
+        columns = self.columns
+        if not self._row_count:
+            columns.extend(_new_column(value) for value in row)
+        for i, value in enumerate(row):
+            try:
+                columns[i].append(value)
+            except (TypeError, OverflowError):
+                # a null or an out of range integer in a numeric column
+                columns[i] = columns[i].tolist()
+                columns[i].append(value)
+        self._row_count += 1
+
+    def to_numpy(self) -> list:
+        """
+        Return every column as a NumPy array. Numeric columns share their memory with the `array.array` they are
+        stored in, and all other columns become arrays of Python objects.
+
+        This requires NumPy to be installed.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ClientException("numpy is required to use to_numpy")
+        return [
+            numpy.frombuffer(column, dtype=column.typecode) if isinstance(column, array)
+            else numpy.array(column, dtype=object)
+            for column in self.columns
+        ]
@@ -14,16 +14,45 @@
 # limitations under the License.
 
 import asyncio
-from .connection import Connection
+import socket
+from typing import List, Sequence, Tuple, Union
+from .balancer import BalancedPool
+from .cache import ResultCache
+from .connection import Connection, _CONNECTION_ERRORS
 from .exception import ClientException
+from .hedging import HedgedPool
+from .metrics import Metrics
+from .multiplex import MultiplexedConnection
+from .pool import Pool
+from .reconnect import ReconnectingConnection
+from .sync import SyncConnection
+from .transport import _open_buffered_connection
 
 
 class Config:
-    def __init__(self, username: str, password: str, host: str = "127.0.0.1", port: int = 2003) -> None:
+    """
+    Connection settings for a Skytable instance. Several instances holding the same data can be given as
+    `endpoints`, a list of `(host, port)` pairs, instead of `host` and `port`. `connect` then uses the first
+    endpoint that accepts a connection, and `create_balanced_pool` spreads queries across all of them.
+
+    With `transport="buffered"`, asynchronous connections receive through an `asyncio.BufferedProtocol` instead of
+    a `StreamReader` (see `BufferedConnection`).
+    """
+
+    def __init__(self, username: str, password: str, host: str = "127.0.0.1", port: int = 2003,
+                 endpoints: Union[None, Sequence[Tuple[str, int]]] = None, transport: str = "streams") -> None:
+        if endpoints is not None:
+            if not endpoints:
+                raise ClientException("no endpoints given")
+            host, port = endpoints[0]
+        if transport not in ("streams", "buffered"):
+            raise ClientException(f"unknown transport {transport}")
         self._username = username
         self._password = password
         self._host = host
         self._port = port
+        self._endpoints = [(host, port)] if endpoints is None else list(endpoints)
+        self._transport = transport
 
     def get_username(self) -> str:
         return self._username
@@ -37,6 +66,13 @@ class Config:
     def get_port(self) -> int:
         return self._port
 
+    def get_endpoints(self) -> List[Tuple[str, int]]:
+        return list(self._endpoints)
+
+    def __endpoint_configs(self) -> List["Config"]:
+        return [Config(self._username, self._password, host, port, transport=self._transport)
+                for host, port in self._endpoints]
+
     def __hs(self) -> bytes:
         return f"H\0\0\0\0\0{len(self.get_username())}\n{len(self.get_password())}\n{self.get_username()}{self.get_password()}".encode()
 
@@ -48,15 +84,135 @@ class Config:
         Exceptions are raised in the following scenarios:
         - If the server responds with a handshake error
         - If the server sends an unknown handshake (usually caused by version incompatibility)
+        - If no endpoint accepts a connection, the error for the last one is raised
+        """
+        if len(self._endpoints) > 1:
+            for config in self.__endpoint_configs():
+                try:
+                    return await config.connect()
+                except _CONNECTION_ERRORS as e:
+                    error = e
+            raise error
+        if self._transport == "buffered":
+            con = await _open_buffered_connection(self.get_host(), self.get_port())
+        else:
+            reader, writer = await asyncio.open_connection(self.get_host(), self.get_port())
+            con = Connection(reader, writer)
+        try:
+            await con._write_all(self.__hs())
+            self.__check_handshake(await con._read_exact(4))
+        except BaseException:
+            con._writer.close()
+            raise
+        return con
+
+    def connect_sync(self, timeout: Union[None, float] = None) -> SyncConnection:
         """
-        reader, writer = await asyncio.open_connection(self.get_host(), self.get_port())
-        con = Connection(reader, writer)
-        await con._write_all(self.__hs())
-        resp = await con._read_exact(4)
+        Establish a blocking connection to the database instance using the set configuration. `timeout` is applied
+        to connecting and to every socket operation.
+
+        ## Exceptions
+        Exceptions are raised in the same scenarios as `connect`
+        """
+        if len(self._endpoints) > 1:
+            for config in self.__endpoint_configs():
+                try:
+                    return config.connect_sync(timeout)
+                except _CONNECTION_ERRORS as e:
+                    error = e
+            raise error
+        sock = socket.create_connection((self.get_host(), self.get_port()), timeout)
+        con = SyncConnection(sock)
+        try:
+            con._write_all(self.__hs())
+            self.__check_handshake(con._read_exact(4))
+        except BaseException:
+            sock.close()
+            raise
+        return con
+
+    @staticmethod
+    def __check_handshake(resp: bytes) -> None:
         a, b, c, d = resp[0], resp[1], resp[2], resp[3]
         if resp == b"H\0\0\0":
-            return con
+            return
         elif a == ord(b'H') and b == 0 and c == 1:
             raise ClientException(f"handshake error {d}")
         else:
             raise ClientException("unknown handshake")
+
+    async def connect_reconnecting(self, max_retries: int = 5, base_delay: float = 0.1,
+                                   max_delay: float = 5.0) -> ReconnectingConnection:
+        """
+        Establish a connection that reconnects when its socket fails, and reruns queries marked idempotent. See
+        `ReconnectingConnection`.
+        """
+        return ReconnectingConnection(self, await self.connect(), max_retries, base_delay, max_delay)
+
+    async def connect_multiplexed(self) -> MultiplexedConnection:
+        """
+        Establish a connection that can be used by many coroutines at the same time. See `MultiplexedConnection`.
+        """
+        return MultiplexedConnection(await self.connect())
+
+    async def create_pool(self, min_size: int = 1, max_size: int = 10, max_idle_time: Union[None, float] = 300.0,
+                          max_lifetime: Union[None, float] = 3600.0,
+                          ping_after_idle: Union[None, float] = 30.0,
+                          metrics: Union[None, Metrics] = None,
+                          result_cache: Union[None, ResultCache] = None) -> Pool:
+        """
+        Create a pool of connections using the set configuration. `min_size` connections are established
+        concurrently before the pool is returned.
+
+        - `max_idle_time`: idle connections beyond `min_size` are closed after being unused for this many seconds
+        - `max_lifetime`: connections are replaced after being open for this many seconds
+        - `ping_after_idle`: a connection that has been idle for this many seconds is checked with a query before it
+        is handed out
+
+        Pass `None` to disable any of these. If `metrics` is given, every connection in the pool records its
+        queries in it (see `Connection.set_metrics`). If `result_cache` is given, every connection in the pool uses it
+        (see `Connection.set_result_cache`).
+        """
+        pool = Pool(self, min_size, max_size, max_idle_time, max_lifetime, ping_after_idle, metrics, result_cache)
+        try:
+            await pool._open()
+        except BaseException:
+            await pool.close()
+            raise
+        return pool
+
+    async def create_hedged_pool(self, replicas: Union[None, Sequence["Config"]] = None, delay: float = 0.05,
+                                 percentile: Union[None, float] = None, min_samples: int = 100,
+                                 min_size: int = 1, max_size: int = 10) -> HedgedPool:
+        """
+        Create a connection pool to this instance and to each of `replicas`, which hold the same data, and hedge
+        reads across them (see `HedgedPool`). Without `replicas`, reads are hedged across the endpoints of this
+        configuration instead. Reads are hedged after `delay` seconds, or after the `percentile`
+        latency of earlier reads once `min_samples` reads have completed. `min_size` and `max_size` apply to the pool
+        for each instance.
+        """
+        pools = []
+        try:
+            configs = self.__endpoint_configs() if replicas is None else (self, *replicas)
+            for config in configs:
+                pools.append(await config.create_pool(min_size, max_size))
+            return HedgedPool(pools, delay, percentile, min_samples)
+        except BaseException:
+            for pool in pools:
+                await pool.close()
+            raise
+
+    async def create_balanced_pool(self, strategy: str = "least_outstanding", min_size: int = 1,
+                                   max_size: int = 10, probe_interval: float = 5.0) -> BalancedPool:
+        """
+        Create a connection pool to every endpoint of this configuration and balance queries across them (see
+        `BalancedPool`). `strategy` is either `least_outstanding` or `ewma`. `min_size` and `max_size` apply to the
+        pool for each endpoint, and endpoints that are down are probed every `probe_interval` seconds.
+        """
+        pool = BalancedPool(self.__endpoint_configs(), strategy, probe_interval)
+        try:
+            await pool._open(min_size, max_size)
+        except BaseException:
+            await pool.close()
+            raise
+        return pool
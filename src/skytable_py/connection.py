@@ -13,10 +13,47 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from asyncio import StreamReader, StreamWriter
-from .query import Query
+from asyncio import IncompleteReadError, StreamReader, StreamWriter, get_event_loop, shield
+from collections import deque
+from itertools import islice
+from time import perf_counter
+from typing import Any, BinaryIO, Callable, Union, Iterable, List, Sequence, AsyncIterator, Tuple
+from .cache import ResultCache, _READ, _classify, _key, _pipeline_statements
+from .columnar import Columns
+from .exception import ClientException
+from .metrics import Metrics, QuerySample
+from .query import Query, PreparedQuery, Pipeline
 from .protocol import Protocol
-from .response import Response
+from .response import Response, BatchSummary, Row
+from .rows import RowFactory
+
+# number of bytes requested by the first read for a response
+_MIN_READ_SIZE = 4096
+# upper bound for the read size as it grows while receiving a large response
+_MAX_READ_SIZE = 1 << 20
+_PING = Query("sysctl report status")
+# errors that mean the connection is gone
+_CONNECTION_ERRORS = (OSError, IncompleteReadError)
+
+
+def _simple_query_metaframe(query: Query) -> bytes:
+    total_packet_size = len(query._q_window_str) + 1 + len(query._buffer)
+    return b"S%d\n%s\n" % (total_packet_size, query._q_window_str)
+
+
+def _pipeline_metaframe(pipeline: Pipeline) -> bytes:
+    return b"P%d\n" % len(pipeline._buffer)
+
+
+def _blob_written(resp: Response, written: Tuple[int, int, bool]) -> int:
+    size, blobs, overflow = written
+    if resp.error() is not None:
+        raise ClientException(f"query failed with error code {resp.error()}")
+    if not blobs:
+        raise ClientException("query did not return a binary or string")
+    if overflow:
+        raise ClientException("response doesn't fit in the sink")
+    return size
 
 
 class Connection:
@@ -28,6 +65,13 @@ class Connection:
         self._reader = reader
         self._writer = writer
         self._protocol = Protocol()
+        self._metrics = None
+        self._result_cache = None
+        # completed once the response of the current row stream has been read in full
+        self._stream = None
+        # set while the rest of an abandoned stream's response is being read
+        self._discarding = False
+        self._stream_sample = None
 
     async def _write_all(self, bytes: bytes):
         self._write(bytes)
@@ -45,6 +89,50 @@ class Connection:
     async def _read_exact(self, count) -> bytes:
         return await self._reader.readexactly(count)
 
+    def is_closed(self) -> bool:
+        """
+        Returns true if this connection was closed by either end
+        """
+        return self._writer.is_closing() or self._reader.at_eof()
+
+    def set_row_factory(self, row_factory: Union[None, RowFactory]) -> None:
+        """
+        Return rows as whatever `row_factory` builds from the plain Python values of their columns instead of as
+        `Row`s, for example `tuple_row`, `dict_row(...)` or `namedtuple_row(...)`. Pass `None` to get `Row`s again.
+        """
+        self._protocol._row_factory = row_factory
+
+    def _replace_transport(self, reader: StreamReader, writer: StreamWriter) -> None:
+        # continue on a new socket, dropping anything left over from the old one
+        self._reader = reader
+        self._writer = writer
+        self._protocol._reset()
+        self.__end_stream()
+
+    def set_metrics(self, metrics: Union[None, Metrics]) -> None:
+        """
+        Record every query run on this connection in `metrics`, which can be shared by several connections. Each
+        simple query, pipeline, streamed query and batch sent by `execute_many` is recorded as one sample. Health
+        checks and responses served from a result cache aren't recorded. Pass `None` to stop recording.
+        """
+        self._metrics = metrics
+
+    def set_result_cache(self, cache: Union[None, ResultCache]) -> None:
+        """
+        Answer `select` queries from `cache` when possible, and invalidate its entries when this connection changes
+        the models they read from (see `ResultCache`). The cache can be shared by several connections. Pass `None` to
+        stop using it.
+        """
+        self._result_cache = cache
+
+    def set_lazy_decoding(self, lazy: bool) -> None:
+        """
+        If enabled, numbers, strings and binaries in responses are only decoded when they are first accessed. This is
+        useful when only a few columns of wide rows are read, but responses keep their receive buffer alive for as
+        long as any of their values haven't been accessed.
+        """
+        self._protocol._lazy = lazy
+
     async def close(self):
         """
         Close this connection
@@ -52,18 +140,320 @@ class Connection:
         self._writer.close()
         await self._writer.wait_closed()
 
-    async def run_simple_query(self, query: Query) -> Response:
-        query_window_str = str(query._q_window)
-        total_packet_size = len(query_window_str) + 1 + len(query._buffer)
-        # write metaframe
-        metaframe = f"S{str(total_packet_size)}\n{query_window_str}\n"
-        await self._write_all(metaframe.encode())
-        # write dataframe
-        await self._write_all(query._buffer)
-        # read response
+    def _write_simple_query(self, query: Query) -> None:
+        # metaframe and dataframe go out in a single write
+        self._writer.writelines((_simple_query_metaframe(query), query._buffer))
+
+    async def _ping(self) -> bool:
+        # an internal health check, which doesn't go through the result cache or metrics
+        self._write_simple_query(_PING)
+        await self._flush()
+        return (await self._read_response()).error() is None
+
+    async def run_simple_query(self, query: Query, row_factory: Union[None, RowFactory] = None) -> Response:
+        """
+        Run a query and return its response. If `row_factory` is given, it overrides the connection's row factory
+        (see `set_row_factory`) for this query.
+        """
+        if self._result_cache is not None:
+            return await self.__run_cached(query, row_factory)
+        return await self.__run_simple_query(query, row_factory)
+
+    async def __run_cached(self, query: Query, row_factory: Union[None, RowFactory]) -> Response:
+        cache = self._result_cache
+        text = bytes(query._buffer[:query._q_window])
+        kind, model = _classify(text)
+        if kind == _READ:
+            key = _key(query, row_factory or self._protocol._row_factory)
+            resp = cache._get(key)
+            if resp is None:
+                resp = await self.__run_simple_query(query, row_factory)
+                if resp.error() is None:
+                    cache._put(key, model, resp)
+            return resp
+        # invalidate again once the statement has run, in case its old results were cached in the meantime
+        cache._statement_executed(text)
+        resp = await self.__run_simple_query(query, row_factory)
+        cache._statement_executed(text)
+        return resp
+
+    async def __run_simple_query(self, query: Query, row_factory: Union[None, RowFactory]) -> Response:
+        sample = self._write_frame(_simple_query_metaframe, query, 1)
+        await self._flush_measured(sample)
+        received = self._protocol._received()
+        resp = await self._read_response(row_factory, sample)
+        self._record_sample(sample, received)
+        return resp
+
+    async def run_pipeline(self, pipeline: Union[Pipeline, Iterable[Query]],
+                           row_factory: Union[None, RowFactory] = None) -> List[Response]:
+        """
+        Send a batch of queries to the server in a single write and return their responses in order.
+
+        If a query fails, its response holds the error code (see `Response.error`) and the remaining queries in the
+        batch are still executed. If `row_factory` is given, it is used for the rows of every response.
+        """
+        if not isinstance(pipeline, Pipeline):
+            pipeline = Pipeline(*pipeline)
+        if self._result_cache is not None:
+            self.__pipeline_executed(pipeline)
+        sample = self._write_frame(_pipeline_metaframe, pipeline, pipeline.get_query_count())
+        await self._flush_measured(sample)
+        received = self._protocol._received()
+        resps = [await self._read_response(row_factory, sample) for _ in range(pipeline.get_query_count())]
+        self._record_sample(sample, received)
+        if self._result_cache is not None:
+            self.__pipeline_executed(pipeline)
+        return resps
+
+    def __pipeline_executed(self, pipeline: Pipeline) -> None:
+        for text in _pipeline_statements(pipeline):
+            self._result_cache._statement_executed(text)
+
+    def _write_frame(self, metaframe_of: Callable[[Union[Query, Pipeline]], bytes], frame: Union[Query, Pipeline],
+                     count: int) -> Union[None, QuerySample]:
+        # write a query or pipeline of `count` queries, returning the sample to fill in if metrics are recorded
+        if self._metrics is None:
+            self._writer.writelines((metaframe_of(frame), frame._buffer))
+            return None
+        sample = QuerySample(count)
+        start = perf_counter()
+        metaframe = metaframe_of(frame)
+        encoded = perf_counter()
+        self._writer.writelines((metaframe, frame._buffer))
+        sample.encode_time = encoded - start
+        sample.write_time = perf_counter() - encoded
+        sample.bytes_written = len(metaframe) + len(frame._buffer)
+        return sample
+
+    async def _flush_measured(self, sample: Union[None, QuerySample]) -> None:
+        if sample is None:
+            await self._flush()
+            return
+        start = perf_counter()
+        await self._flush()
+        sample.write_time += perf_counter() - start
+
+    def _record_sample(self, sample: Union[None, QuerySample], received: int) -> None:
+        # `received` is the number of bytes that had been received before the sample's responses were read
+        if sample is not None and self._metrics is not None:
+            sample.bytes_read = self._protocol._received() - received
+            self._metrics._record(sample)
+
+    async def execute_many(self, template: Union[str, PreparedQuery], params: Iterable[Sequence],
+                           batch_size: int = 1000, max_batches_in_flight: int = 4) -> BatchSummary:
+        """
+        Run `template` once for every parameter set in `params`, which can be any iterable (including a generator).
+
+        Parameter sets are consumed lazily and sent as pipelines of `batch_size` queries. Up to
+        `max_batches_in_flight` pipelines are sent before waiting for responses, so only that many batches are held in
+        memory at a time. A failing query doesn't stop the others; its error is recorded in the returned summary.
+
+        If `params` raises or holds a parameter that can't be encoded, the responses to the batches already sent are
+        read before the exception is passed on. If this is cancelled or the connection fails, the connection is closed.
+        """
+        if isinstance(template, str):
+            template = Query.template(template)
+        if self._result_cache is not None:
+            self._result_cache._statement_executed(template._query)
+        summary = BatchSummary()
+        in_flight = deque()
+        params = iter(params)
+        in_step = False
+        try:
+            while True:
+                pipeline = Pipeline()
+                try:
+                    for param_set in islice(params, batch_size):
+                        pipeline.add_query(template.bind(*param_set))
+                except Exception:
+                    # the batches already sent are still answered, so read their responses before giving up
+                    while in_flight:
+                        await self.__collect(*in_flight.popleft(), summary)
+                    in_step = True
+                    raise
+                if not pipeline.get_query_count():
+                    break
+                if len(in_flight) == max_batches_in_flight:
+                    await self.__collect(*in_flight.popleft(), summary)
+                sample = self._write_frame(_pipeline_metaframe, pipeline, pipeline.get_query_count())
+                await self._flush_measured(sample)
+                in_flight.append((pipeline.get_query_count(), sample))
+            while in_flight:
+                await self.__collect(*in_flight.popleft(), summary)
+        except BaseException:
+            if not in_step:
+                # cancelled or failed with responses still on their way, so the connection can't be used any more
+                self._writer.close()
+            raise
+        finally:
+            if self._result_cache is not None:
+                self._result_cache._statement_executed(template._query)
+        return summary
+
+    async def __collect(self, count: int, sample: Union[None, QuerySample], summary: BatchSummary) -> None:
+        received = self._protocol._received()
+        for _ in range(count):
+            summary._record(await self._read_response(sample=sample))
+        self._record_sample(sample, received)
+
+    async def stream_rows(self, query: Query,
+                          row_factory: Union[None, RowFactory] = None) -> AsyncIterator[Union[Row, Any]]:
+        """
+        Run a query and yield the rows it returns as soon as each one has been received, without holding the whole
+        result set in memory:
+
+        ```python
+        async for row in db.stream_rows(Query("select all * from apps.auth limit ?", UInt(1_000_000))):
+            ...
+        ```
+
+        A query returning a single row yields just that row. If the server returns an error, a `ClientException` is
+        raised. If iteration is stopped early, the rest of the response is read and discarded when the generator is
+        closed, or before the next response on this connection is read if that comes first, so the connection can
+        still be used. If `row_factory` is given, it is used instead of the connection's row factory.
+        """
+        batches = self.__stream_row_batches(query, False, row_factory)
+        try:
+            async for batch in batches:
+                for row in batch:
+                    yield row
+        finally:
+            await batches.aclose()
+
+    async def fetch_columns(self, query: Query) -> Columns:
+        """
+        Run a query and decode the rows it returns into one container per column (see `Columns`), without creating
+        a `Row` or `Value` for every row and cell.
+
+        If the server returns an error, a `ClientException` is raised.
+        """
+        columns = Columns()
+        async for batch in self.__stream_row_batches(query, True):
+            for row in batch:
+                columns._append_row(row)
+        return columns
+
+    async def read_blob_into(self, query: Query, sink: Union[BinaryIO, memoryview, bytearray]) -> int:
+        """
+        Run a query that returns a binary or string (or a row of them) and write its bytes straight into `sink`
+        instead of decoding them, returning the number of bytes written. `sink` is either a writable buffer, which
+        is filled from the start, or a file-like object with a `write` method.
+
+        A `ClientException` is raised if the server returns an error, if the response has no binary or string, or
+        if it doesn't fit in a buffer.
+        """
+        sample = self._write_frame(_simple_query_metaframe, query, 1)
+        await self._flush_measured(sample)
+        await self._finish_stream()
+        received = self._protocol._received()
+        self._protocol._begin_blob_sink(sink)
+        try:
+            resp = await self._read_response(sample=sample)
+        finally:
+            written = self._protocol._end_blob_sink()
+        self._record_sample(sample, received)
+        return _blob_written(resp, written)
+
+    async def __stream_row_batches(self, query: Query, native: bool, row_factory: Union[None, RowFactory] = None
+                                   ) -> AsyncIterator[List[Union[Row, list, Any]]]:
+        sample = self._write_frame(_simple_query_metaframe, query, 1)
+        await self._flush_measured(sample)
+        await self._finish_stream()
+        protocol = self._protocol
+        protocol._begin_row_stream(native)
+        stream = self._stream = get_event_loop().create_future()
+        # recorded once the response has been read, whether by this generator or after it was abandoned
+        self._stream_sample = (sample, protocol._received())
+        read_size = _MIN_READ_SIZE
+        try:
+            while True:
+                resp = self.__parse(row_factory, sample)
+                rows = protocol._take_streamed_rows()
+                if resp is not None:
+                    self.__end_stream()
+                if rows:
+                    yield rows
+                    if resp is None and self._stream is not stream:
+                        raise ClientException("stream was abandoned before the next query")
+                if resp is not None:
+                    break
+                read_size = await self.__read_more(read_size, sample)
+        except GeneratorExit:
+            # stopped early, so discard the rest of the response unless a later query already did
+            if self._stream is stream:
+                await self._finish_stream()
+            raise
+        row = resp.row()
+        if row is not None:
+            yield [[value.data() for value in row.columns] if native else row]
+        elif resp.error() is not None:
+            raise ClientException(f"query failed with error code {resp.error()}")
+        elif resp.rows() is None and not resp.is_empty():
+            raise ClientException("query did not return rows")
+
+    def __end_stream(self) -> None:
+        self._protocol._end_row_stream()
+        if self._stream_sample is not None:
+            self._record_sample(*self._stream_sample)
+            self._stream_sample = None
+        stream = self._stream
+        self._stream = None
+        if stream is not None and not stream.done():
+            stream.set_result(None)
+
+    async def _finish_stream(self) -> None:
+        # read the rest of the response of a stream that was abandoned, which comes before any later response
+        while self._stream is not None:
+            if self._discarding:
+                await shield(self._stream)
+                continue
+            self._discarding = True
+            protocol = self._protocol
+            read_size = _MIN_READ_SIZE
+            try:
+                while protocol.parse() is None:
+                    protocol._take_streamed_rows()
+                    read_size = await self._read_more(read_size)
+            finally:
+                self._discarding = False
+                # on failure the connection can't be used anyway, so stop waiting for the stream
+                self.__end_stream()
+
+    async def _read_response(self, row_factory: Union[None, RowFactory] = None,
+                             sample: Union[None, QuerySample] = None) -> Response:
+        if self._stream is not None:
+            await self._finish_stream()
+        read_size = _MIN_READ_SIZE
         while True:
-            new_block = await self._reader.read(1024)
-            self._protocol.push_additional_bytes(new_block)
-            resp = self._protocol.parse()
-            if resp:
+            # a previous read may already hold this response
+            resp = self.__parse(row_factory, sample)
+            if resp is not None:
                 return resp
+            read_size = await self.__read_more(read_size, sample)
+
+    def __parse(self, row_factory: Union[None, RowFactory], sample: Union[None, QuerySample]) -> Union[None, Response]:
+        if sample is None:
+            return self._protocol.parse(row_factory)
+        start = perf_counter()
+        resp = self._protocol.parse(row_factory)
+        sample.parse_time += perf_counter() - start
+        sample.parse_attempts += 1
+        return resp
+
+    async def __read_more(self, read_size: int, sample: Union[None, QuerySample]) -> int:
+        if sample is None:
+            return await self._read_more(read_size)
+        start = perf_counter()
+        read_size = await self._read_more(read_size)
+        sample.wait_time += perf_counter() - start
+        sample.reads += 1
+        return read_size
+
+    async def _read_more(self, read_size: int) -> int:
+        new_block = await self._reader.read(max(read_size, self._protocol.bytes_needed()))
+        if not new_block:
+            raise ConnectionResetError("connection closed by server")
+        self._protocol.push_additional_bytes(new_block)
+        # if this isn't enough, it's a large response so read more at a time
+        return min(2 * read_size, _MAX_READ_SIZE)
@@ -0,0 +1,198 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import math
+from decimal import Decimal
+from typing import Any, Callable, Iterable, List, Sequence, Union
+from .config import Config
+from .exception import ClientException
+
+# the response to a DDL or DML query
+EMPTY = b"\x12"
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Encode a Python value as a Skyhash/2 element. Integers are sent as 64-bit unsigned or signed integers and floats
+    as 64-bit floats.
+    """
+    if value is None:
+        return b"\x00"
+    elif isinstance(value, bool):
+        return b"\x01\x01" if value else b"\x01\x00"
+    elif isinstance(value, int):
+        return b"\x05%d\n" % value if value >= 0 else b"\x09%d\n" % value
+    elif isinstance(value, float):
+        return b"\x0B%s\n" % _format_float(value)
+    elif isinstance(value, bytes):
+        return b"\x0C%d\n%s" % (len(value), value)
+    elif isinstance(value, str):
+        encoded = value.encode()
+        return b"\x0D%d\n%s" % (len(encoded), encoded)
+    elif isinstance(value, list):
+        return b"\x0E%d\n%s" % (len(value), b"".join(encode_value(item) for item in value))
+    raise ClientException("unsupported type")
+
+
+def _format_float(value: float) -> bytes:
+    # the same as Rust's `Display` for f64: never in exponent notation, and without a fraction if it's integral
+    if math.isnan(value):
+        return b"NaN"
+    elif math.isinf(value):
+        return b"inf" if value > 0 else b"-inf"
+    formatted = format(Decimal(repr(value)), "f")
+    if "." in formatted:
+        formatted = formatted.rstrip("0").rstrip(".")
+    return formatted.encode()
+
+
+def encode_row(row: Sequence[Any]) -> bytes:
+    """
+    Encode a single row response
+    """
+    return b"\x11%d\n%s" % (len(row), b"".join(encode_value(value) for value in row))
+
+
+def encode_rows(rows: Sequence[Sequence[Any]]) -> bytes:
+    """
+    Encode a multi-row response
+    """
+    return b"\x13%d\n%s" % (len(rows), b"".join(
+        b"%d\n%s" % (len(row), b"".join(encode_value(value) for value in row)) for row in rows))
+
+
+def encode_error(code: int) -> bytes:
+    """
+    Encode an error response
+    """
+    return b"\x10" + code.to_bytes(2, "little")
+
+
+def scripted(responses: Iterable[bytes]) -> Callable[[bytes], bytes]:
+    """
+    Return a handler that answers queries with `responses` in order, regardless of the query
+    """
+    responses = iter(responses)
+    return lambda query: next(responses)
+
+
+class Emulator:
+    """
+    An in-process stand-in for a Skytable server, for testing and for measuring the client in isolation.
+
+    It accepts any handshake and answers every query with `handler(query)`, where `query` is the encoded query
+    followed by its encoded parameters, and the handler returns an encoded response (see `encode_value`,
+    `encode_row`, `encode_rows` and `encode_error`). Queries in a pipeline are answered one by one.
+
+    - `latency`: seconds to wait before answering each simple query or pipeline
+    - `chunk_size`: if set, responses are written this many bytes at a time, draining in between, so that the
+    client receives them fragmented
+    - `record_queries`: if set, every query received is appended to `queries`
+
+    ```python
+    async with Emulator(lambda query: encode_rows([["sayan", 25]] * 1000)) as server:
+        db = await server.config().connect()
+    ```
+    """
+
+    def __init__(self, handler: Callable[[bytes], bytes] = lambda query: EMPTY, host: str = "127.0.0.1",
+                 port: int = 0, latency: float = 0.0, chunk_size: Union[None, int] = None,
+                 record_queries: bool = True) -> None:
+        self.handler = handler
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.record_queries = record_queries
+        self.handshakes = 0
+        self.queries: List[bytes] = []
+        self.host = host
+        self.port = port
+        self._server = None
+        self._clients = []
+        self._tasks = set()
+
+    async def start(self) -> "Emulator":
+        self._server = await asyncio.start_server(self.__client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        for writer in self._clients:
+            writer.close()
+        self._server.close()
+        # closing the writers ends the client handlers, so let them finish
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def __aenter__(self) -> "Emulator":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def config(self, username: str = "root", password: str = "password", transport: str = "streams") -> Config:
+        """
+        Return a `Config` for connecting to this emulator
+        """
+        return Config(username, password, self.host, self.port, transport=transport)
+
+    async def __read_int(self, reader: asyncio.StreamReader) -> int:
+        return int((await reader.readuntil(b"\n"))[:-1])
+
+    async def __write(self, writer: asyncio.StreamWriter, data: bytes) -> None:
+        if self.chunk_size is None:
+            writer.write(data)
+            return
+        for i in range(0, len(data), self.chunk_size):
+            writer.write(data[i:i + self.chunk_size])
+            await writer.drain()
+
+    async def __client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.append(writer)
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            await reader.readexactly(6)
+            username_len = await self.__read_int(reader)
+            password_len = await self.__read_int(reader)
+            await reader.readexactly(username_len + password_len)
+            self.handshakes += 1
+            writer.write(b"H\0\0\0")
+            while True:
+                kind = await reader.readexactly(1)
+                packet = await reader.readexactly(await self.__read_int(reader))
+                if kind == b"S":
+                    window, packet = packet.split(b"\n", 1)
+                    queries = [packet]
+                else:
+                    queries = []
+                    while packet:
+                        window, params, packet = packet.split(b"\n", 2)
+                        size = int(window) + int(params)
+                        queries.append(packet[:size])
+                        packet = packet[size:]
+                if self.record_queries:
+                    self.queries.extend(queries)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                for query in queries:
+                    await self.__write(writer, self.handler(query))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # a handler that is cancelled while the event loop shuts down has nothing left to clean up
+            pass
+        finally:
+            self._tasks.discard(task)
+            writer.close()
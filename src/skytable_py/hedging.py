@@ -0,0 +1,128 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from time import perf_counter
+from typing import List, Sequence, Union
+from .cache import _READ, _classify
+from .exception import ClientException
+from .metrics import Histogram, _TIME_BOUNDS
+from .pool import Pool
+from .query import Query
+from .response import Response
+from .rows import RowFactory
+
+
+class HedgedPool:
+    """
+    Connection pools to several Skytable instances holding the same data, used to hedge reads. Use
+    `Config.create_hedged_pool` to create one.
+
+    A `select` is sent to one instance. If it hasn't been answered after the hedging delay, it is also sent to the
+    next instance and the first response to arrive is returned. The other query is cancelled and its connection is
+    closed, since its response may still be on the way. Every other statement only goes to the first instance.
+
+    The delay is either fixed, or learned from the latency of earlier reads: with `percentile` set (for example
+    `0.95`), a read is hedged once it takes longer than that percentile of the reads so far. Until `min_samples`
+    reads have completed, the fixed `delay` is used.
+    """
+
+    def __init__(self, pools: Sequence[Pool], delay: float, percentile: Union[None, float],
+                 min_samples: int) -> None:
+        if len(pools) < 2:
+            raise ClientException("hedging needs at least two instances")
+        self._pools = list(pools)
+        self._delay = delay
+        self._percentile = percentile
+        self._min_samples = min_samples
+        self._latency = Histogram(_TIME_BOUNDS)
+        # the instance that receives the next read first, rotated to spread the load
+        self._next = 0
+        self.hedged = 0
+
+    def get_pools(self) -> List[Pool]:
+        return list(self._pools)
+
+    def get_delay(self) -> float:
+        """
+        Returns the current hedging delay in seconds
+        """
+        if self._percentile is not None and self._latency.count >= self._min_samples:
+            return self._latency.percentile(self._percentile)
+        return self._delay
+
+    async def run_simple_query(self, query: Query, row_factory: Union[None, RowFactory] = None) -> Response:
+        kind, _ = _classify(bytes(query._buffer[:query._q_window]))
+        if kind != _READ:
+            return await self.__run(self._pools[0], query, row_factory)
+        first = self._next
+        self._next = (first + 1) % len(self._pools)
+        start = perf_counter()
+        primary = asyncio.ensure_future(self.__run(self._pools[first], query, row_factory))
+        try:
+            done, _ = await asyncio.wait((primary,), timeout=self.get_delay())
+            if done:
+                resp = primary.result()
+            else:
+                self.hedged += 1
+                second = self._pools[(first + 1) % len(self._pools)]
+                resp = await self.__first_response(primary, asyncio.ensure_future(self.__run(second, query,
+                                                                                                    row_factory)))
+        except BaseException:
+            await self.__cancel(primary)
+            raise
+        self._latency.observe(perf_counter() - start)
+        return resp
+
+    async def __first_response(self, *attempts: "asyncio.Future[Response]") -> Response:
+        pending = set(attempts)
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                failed = None
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+                    failed = attempt
+                if not pending:
+                    # every attempt failed
+                    return failed.result()
+        finally:
+            for attempt in pending:
+                await self.__cancel(attempt)
+
+    @staticmethod
+    async def __cancel(attempt: "asyncio.Future[Response]") -> None:
+        # the pool closes the connection of a cancelled query
+        if attempt.done():
+            return
+        attempt.cancel()
+        # unlike awaiting the attempt itself, this doesn't raise its cancellation
+        await asyncio.wait((attempt,))
+
+    @staticmethod
+    async def __run(pool: Pool, query: Query, row_factory: Union[None, RowFactory]) -> Response:
+        async with pool.acquire() as db:
+            return await db.run_simple_query(query, row_factory)
+
+    async def close(self) -> None:
+        for pool in self._pools:
+            await pool.close()
+
+    async def __aenter__(self) -> "HedgedPool":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
@@ -0,0 +1,145 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A load generator that drives `Connection`s from concurrent workers and reports throughput and latency
+percentiles:
+
+    python -m skytable_py.loadgen --workers 32 --duration 10 --rows 100
+
+Without `--host`, queries are answered by an in-process `Emulator`, which measures the overhead of the client
+alone.
+"""
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+from typing import Dict, List, Union
+from .config import Config
+from .emulator import Emulator, EMPTY, encode_rows
+from .query import Query
+
+
+class _Stats:
+    def __init__(self, requests: Union[None, int]) -> None:
+        self.remaining = requests
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def take(self) -> bool:
+        # claim the next request, if the total number of requests is limited
+        if self.remaining is None:
+            return True
+        if self.remaining == 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+def _percentile(latencies: List[float], p: float) -> float:
+    # nearest-rank percentile of sorted latencies
+    if not latencies:
+        return 0.0
+    return latencies[min(len(latencies) - 1, max(0, math.ceil(p * len(latencies)) - 1))]
+
+
+async def _worker(config: Config, query: Query, stats: _Stats, deadline: float) -> None:
+    db = await config.connect()
+    try:
+        while time.perf_counter() < deadline and stats.take():
+            start = time.perf_counter()
+            resp = await db.run_simple_query(query)
+            stats.latencies.append(time.perf_counter() - start)
+            if resp.error() is not None:
+                stats.errors += 1
+    finally:
+        await db.close()
+
+
+async def run(config: Config, query: Query, workers: int = 16, duration: Union[None, float] = 10.0,
+              requests: Union[None, int] = None) -> Dict[str, float]:
+    """
+    Run `query` from `workers` concurrent connections until `duration` seconds have passed or `requests` queries
+    have been run, whichever comes first, and return the throughput and latency percentiles (in seconds).
+    """
+    stats = _Stats(requests)
+    deadline = math.inf if duration is None else time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(config, query, stats, deadline) for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(stats.latencies)
+    return {
+        "requests": len(latencies),
+        "errors": stats.errors,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50": _percentile(latencies, 0.5),
+        "p99": _percentile(latencies, 0.99),
+        "p999": _percentile(latencies, 0.999),
+    }
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m skytable_py.loadgen", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", help="server to connect to (default: an in-process emulator)")
+    parser.add_argument("--port", type=int, default=2003)
+    parser.add_argument("--username", default="root")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--query", default="select all * from apps.users limit 100", help="query to run")
+    parser.add_argument("--workers", type=int, default=16, help="number of concurrent connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run for")
+    parser.add_argument("--requests", type=int, help="stop after this many queries")
+    parser.add_argument("--transport", choices=("streams", "buffered"), default="streams",
+                        help="how connections receive data")
+    emulator = parser.add_argument_group("emulator")
+    emulator.add_argument("--rows", type=int, default=1, help="rows returned for every query (0 for empty)")
+    emulator.add_argument("--columns", type=int, default=4, help="columns in every row")
+    emulator.add_argument("--latency", type=float, default=0.0, help="seconds before answering each query")
+    emulator.add_argument("--chunk-size", type=int, help="write responses this many bytes at a time")
+    return parser.parse_args()
+
+
+def _generated_response(rows: int, columns: int) -> bytes:
+    if not rows:
+        return EMPTY
+    row = [f"user{i}" if i % 2 == 0 else i for i in range(columns)]
+    return encode_rows([row] * rows)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    query = Query(args.query)
+    if args.host is None:
+        response = _generated_response(args.rows, args.columns)
+        emulator = Emulator(lambda query: response, latency=args.latency, chunk_size=args.chunk_size,
+                            record_queries=False)
+        async with emulator:
+            report = await run(emulator.config(args.username, args.password, args.transport), query, args.workers,
+                               args.duration, args.requests)
+    else:
+        config = Config(args.username, args.password, args.host, args.port, transport=args.transport)
+        report = await run(config, query, args.workers, args.duration, args.requests)
+    print(f"requests:   {report['requests']} ({report['errors']} errors) in {report['elapsed']:.2f}s")
+    print(f"throughput: {report['throughput']:.1f} queries/sec")
+    for p in ("p50", "p99", "p999"):
+        print(f"{p + ':':<12}{report[p] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main(_parse_args()))
+    except KeyboardInterrupt:
+        sys.exit(130)
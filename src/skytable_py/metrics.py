@@ -0,0 +1,144 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Union
+
+# histogram bounds for durations: 1 microsecond to about 67 seconds, doubling each time
+_TIME_BOUNDS = tuple(1e-6 * 2 ** i for i in range(27))
+# histogram bounds for counts: 1 to 65536, doubling each time
+_COUNT_BOUNDS = tuple(float(2 ** i) for i in range(17))
+
+
+class Histogram:
+    """
+    A histogram with fixed bucket bounds. A value is counted in the first bucket whose upper bound is at least the
+    value, or in an overflow bucket if it's larger than every bound.
+    """
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """
+        Return an upper bound for the `p` percentile (between 0 and 1): the bound of the bucket it falls in, or the
+        largest value observed if it falls in the overflow bucket
+        """
+        if not self.count:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+
+class QuerySample:
+    """
+    Measurements for a single query or pipeline. Durations are in seconds:
+
+    - `encode_time`: building the packet around the encoded query
+    - `write_time`: writing the packet and waiting for the write buffer to drain
+    - `wait_time`: waiting for the response to arrive from the server
+    - `parse_time`: decoding the response
+    """
+    __slots__ = ("queries", "bytes_written", "bytes_read", "reads", "parse_attempts", "encode_time", "write_time",
+                 "wait_time", "parse_time")
+
+    def __init__(self, queries: int = 1) -> None:
+        self.queries = queries
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.reads = 0
+        self.parse_attempts = 0
+        self.encode_time = 0.0
+        self.write_time = 0.0
+        self.wait_time = 0.0
+        self.parse_time = 0.0
+
+    def total_time(self) -> float:
+        return self.encode_time + self.write_time + self.wait_time + self.parse_time
+
+
+class Metrics:
+    """
+    Counters and histograms for the queries run on one or more connections (see `Connection.set_metrics`). Each
+    simple query, pipeline, streamed query or `execute_many` batch is recorded as a `QuerySample`, which is also
+    passed to every listener added with `add_listener`, for exporting to a metrics system.
+    """
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.reads_per_response = Histogram(_COUNT_BOUNDS)
+        self.parse_attempts_per_response = Histogram(_COUNT_BOUNDS)
+        self.encode_time = Histogram(_TIME_BOUNDS)
+        self.write_time = Histogram(_TIME_BOUNDS)
+        self.wait_time = Histogram(_TIME_BOUNDS)
+        self.parse_time = Histogram(_TIME_BOUNDS)
+        self.total_time = Histogram(_TIME_BOUNDS)
+        self._listeners: List[Callable[[QuerySample], None]] = []
+
+    def add_listener(self, listener: Callable[[QuerySample], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[QuerySample], None]) -> None:
+        self._listeners.remove(listener)
+
+    def _record(self, sample: QuerySample) -> None:
+        self.queries += sample.queries
+        self.bytes_written += sample.bytes_written
+        self.bytes_read += sample.bytes_read
+        # a pipeline is recorded as one observation per response
+        for _ in range(sample.queries):
+            self.reads_per_response.observe(sample.reads / sample.queries)
+            self.parse_attempts_per_response.observe(sample.parse_attempts / sample.queries)
+        self.encode_time.observe(sample.encode_time)
+        self.write_time.observe(sample.write_time)
+        self.wait_time.observe(sample.wait_time)
+        self.parse_time.observe(sample.parse_time)
+        self.total_time.observe(sample.total_time())
+        for listener in self._listeners:
+            listener(sample)
+
+    def summary(self) -> Dict[str, Union[int, float]]:
+        """
+        Return the counters along with the mean, p50 and p99 of every histogram, keyed by name
+        """
+        summary = {"queries": self.queries, "bytes_written": self.bytes_written, "bytes_read": self.bytes_read}
+        for name in ("reads_per_response", "parse_attempts_per_response", "encode_time", "write_time", "wait_time",
+                     "parse_time", "total_time"):
+            histogram = getattr(self, name)
+            summary[f"{name}.mean"] = histogram.mean()
+            summary[f"{name}.p50"] = histogram.percentile(0.5)
+            summary[f"{name}.p99"] = histogram.percentile(0.99)
+        return summary
@@ -0,0 +1,166 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections import deque
+from time import perf_counter
+from typing import Awaitable, Iterable, List, TypeVar, Union
+from .connection import Connection, _simple_query_metaframe, _pipeline_metaframe
+from .exception import ClientException
+from .metrics import Metrics, QuerySample
+from .query import Query, Pipeline
+from .response import Response
+
+T = TypeVar("T")
+
+
+class MultiplexedConnection:
+    """
+    A connection that can be shared by any number of coroutines. Use `Config.connect_multiplexed` to create one.
+
+    Queries are written to the socket in the order they are submitted and a single background task decodes the
+    responses, handing each one to the query that is first in line. Since the server answers queries in order, many
+    queries can be in flight at once on the same socket.
+    """
+
+    def __init__(self, connection: Connection) -> None:
+        self._connection = connection
+        # a future and metrics sample (or `None`) per response that hasn't been received yet, in the order the queries
+        # were written. The queries of a pipeline share one sample.
+        self._pending = deque()
+        self._flush_lock = asyncio.Lock()
+        self._error = None
+        self._reader = asyncio.ensure_future(self.__read_responses())
+
+    def get_pending_count(self) -> int:
+        """
+        Returns the number of queries waiting for a response
+        """
+        return len(self._pending)
+
+    def set_metrics(self, metrics: Union[None, Metrics]) -> None:
+        """
+        Record every query run on this connection in `metrics`. See `Connection.set_metrics`.
+        """
+        self._connection.set_metrics(metrics)
+
+    def __check_open(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    async def __flush(self) -> None:
+        # older Python versions don't allow concurrent drains on the same stream
+        async with self._flush_lock:
+            await self._connection._flush()
+
+    async def __flush_measured(self, sample: Union[None, QuerySample]) -> None:
+        if sample is None:
+            await self.__flush()
+            return
+        # time spent waiting for another query's flush counts as writing
+        start = perf_counter()
+        await self.__flush()
+        sample.write_time += perf_counter() - start
+
+    async def __wait_measured(self, sample: Union[None, QuerySample], responses: Awaitable[T]) -> T:
+        if sample is None:
+            return await responses
+        start = perf_counter()
+        result = await responses
+        # responses are decoded by the reader task, which also fills in the bytes read and the decoding time
+        sample.wait_time = perf_counter() - start - sample.parse_time
+        metrics = self._connection._metrics
+        if metrics is not None:
+            metrics._record(sample)
+        return result
+
+    async def run_simple_query(self, query: Query) -> Response:
+        self.__check_open()
+        future = asyncio.get_event_loop().create_future()
+        # nothing is awaited between queuing the future and writing the query, so they are in the same order
+        sample = self._connection._write_frame(_simple_query_metaframe, query, 1)
+        self._pending.append((future, sample))
+        await self.__flush_measured(sample)
+        return await self.__wait_measured(sample, future)
+
+    async def run_pipeline(self, pipeline: Union[Pipeline, Iterable[Query]]) -> List[Response]:
+        """
+        Send a batch of queries in a single write and return their responses in order. See
+        `Connection.run_pipeline`.
+        """
+        self.__check_open()
+        if not isinstance(pipeline, Pipeline):
+            pipeline = Pipeline(*pipeline)
+        loop = asyncio.get_event_loop()
+        futures = [loop.create_future() for _ in range(pipeline.get_query_count())]
+        sample = self._connection._write_frame(_pipeline_metaframe, pipeline, len(futures))
+        self._pending.extend((future, sample) for future in futures)
+        await self.__flush_measured(sample)
+        return list(await self.__wait_measured(sample, asyncio.gather(*futures)))
+
+    async def __read_responses(self) -> None:
+        connection = self._connection
+        received = connection._protocol._received()
+        try:
+            while True:
+                # a query may be submitted while its response is already being waited for, so the decoding stats
+                # are collected separately and then added to its sample
+                reading = None if connection._metrics is None else QuerySample()
+                resp = await connection._read_response(sample=reading)
+                if not self._pending:
+                    raise ClientException("received a response without a query")
+                future, sample = self._pending.popleft()
+                if sample is not None and reading is not None:
+                    sample.reads += reading.reads
+                    sample.parse_attempts += reading.parse_attempts
+                    sample.parse_time += reading.parse_time
+                if sample is None or not self._pending or self._pending[0][1] is not sample:
+                    # this was the last response for the sample
+                    if sample is not None:
+                        sample.bytes_read = connection._protocol._received() - received
+                    received = connection._protocol._received()
+                # the query may have been cancelled, but its response still had to be consumed
+                if not future.done():
+                    future.set_result(resp)
+        except asyncio.CancelledError:
+            self.__fail(ClientException("connection closed"))
+            raise
+        except Exception as e:
+            self.__fail(e)
+
+    def __fail(self, error: Exception) -> None:
+        self._error = error
+        while self._pending:
+            future, _ = self._pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    def is_closed(self) -> bool:
+        return self._error is not None or self._connection.is_closed()
+
+    async def close(self) -> None:
+        """
+        Close this connection. Queries that are still waiting for a response fail with a `ClientException`.
+        """
+        self._reader.cancel()
+        try:
+            await self._reader
+        except asyncio.CancelledError:
+            pass
+        try:
+            await self._connection.close()
+        except ConnectionError:
+            # already closed by the server
+            pass
@@ -0,0 +1,201 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import TYPE_CHECKING, AsyncIterator, Union
+from .cache import ResultCache
+from .connection import Connection, _CONNECTION_ERRORS
+from .exception import ClientException
+from .metrics import Metrics
+
+if TYPE_CHECKING:
+    from .config import Config
+
+
+class _PooledConnection:
+    __slots__ = ("connection", "created_at", "last_used")
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+        self.created_at = monotonic()
+        self.last_used = self.created_at
+
+
+class Pool:
+    """
+    A pool of authenticated connections to a Skytable instance. Use `Config.create_pool` to create a pool.
+
+    Connections are borrowed using `acquire`:
+    ```python
+    async with pool.acquire() as db:
+        resp = await db.run_simple_query(Query("select * from apps.auth where username = ?", "sayan"))
+    ```
+    """
+
+    def __init__(self, config: "Config", min_size: int, max_size: int, max_idle_time: Union[None, float],
+                 max_lifetime: Union[None, float], ping_after_idle: Union[None, float],
+                 metrics: Union[None, Metrics] = None, result_cache: Union[None, ResultCache] = None) -> None:
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ClientException("invalid pool size")
+        self._config = config
+        self._min_size = min_size
+        self._max_size = max_size
+        self._max_idle_time = max_idle_time
+        self._max_lifetime = max_lifetime
+        self._ping_after_idle = ping_after_idle
+        self._metrics = metrics
+        self._result_cache = result_cache
+        # most recently used connections are at the right
+        self._idle = deque()
+        self._size = 0
+        self._permits = asyncio.Semaphore(max_size)
+        self._reaper = None
+        self._closed = False
+
+    def get_size(self) -> int:
+        """
+        Returns the number of open connections, including the ones that are in use
+        """
+        return self._size
+
+    def get_idle_count(self) -> int:
+        return len(self._idle)
+
+    def get_metrics(self) -> Union[None, Metrics]:
+        """
+        Returns the metrics shared by every connection in this pool, if enabled
+        """
+        return self._metrics
+
+    async def _open(self) -> None:
+        await asyncio.gather(*(self.__fill() for _ in range(self._min_size)))
+        intervals = [t for t in (self._max_idle_time, self._max_lifetime) if t is not None]
+        if intervals:
+            self._reaper = asyncio.ensure_future(self.__reap(min(intervals) / 2))
+
+    async def __connect(self) -> _PooledConnection:
+        self._size += 1
+        try:
+            connection = await self._config.connect()
+        except BaseException:
+            self._size -= 1
+            raise
+        connection.set_metrics(self._metrics)
+        connection.set_result_cache(self._result_cache)
+        return _PooledConnection(connection)
+
+    async def __fill(self) -> None:
+        self._idle.appendleft(await self.__connect())
+
+    async def __discard(self, pooled: _PooledConnection) -> None:
+        self._size -= 1
+        try:
+            await pooled.connection.close()
+        except OSError:
+            pass
+
+    def __is_expired(self, pooled: _PooledConnection, now: float) -> bool:
+        return self._max_lifetime is not None and now - pooled.created_at > self._max_lifetime
+
+    async def __is_healthy(self, pooled: _PooledConnection) -> bool:
+        now = monotonic()
+        if pooled.connection.is_closed() or self.__is_expired(pooled, now):
+            return False
+        if self._ping_after_idle is not None and now - pooled.last_used > self._ping_after_idle:
+            try:
+                return await pooled.connection._ping()
+            except _CONNECTION_ERRORS + (ClientException,):
+                return False
+        return True
+
+    async def __acquire(self) -> _PooledConnection:
+        if self._closed:
+            raise ClientException("pool is closed")
+        await self._permits.acquire()
+        try:
+            while self._idle:
+                pooled = self._idle.pop()
+                if await self.__is_healthy(pooled):
+                    return pooled
+                await self.__discard(pooled)
+            return await self.__connect()
+        except BaseException:
+            self._permits.release()
+            raise
+
+    async def __release(self, pooled: _PooledConnection, reusable: bool) -> None:
+        self._permits.release()
+        pooled.last_used = monotonic()
+        if reusable and not self._closed and not self.__is_expired(pooled, pooled.last_used):
+            self._idle.append(pooled)
+        else:
+            await self.__discard(pooled)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Connection]:
+        """
+        Borrow a connection from the pool, waiting for one to be released if `max_size` connections are in use.
+
+        The connection is returned to the pool when the block exits. If the block raises, the connection may be
+        left halfway through a query, so it is closed instead.
+        """
+        pooled = await self.__acquire()
+        try:
+            yield pooled.connection
+        except BaseException:
+            await self.__release(pooled, False)
+            raise
+        await self.__release(pooled, True)
+
+    async def __reap(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            now = monotonic()
+            evicted = []
+            for pooled in list(self._idle):
+                idle_too_long = self._max_idle_time is not None and now - pooled.last_used > self._max_idle_time
+                if self.__is_expired(pooled, now) or (idle_too_long and self._size - len(evicted) > self._min_size):
+                    self._idle.remove(pooled)
+                    evicted.append(pooled)
+            for pooled in evicted:
+                await self.__discard(pooled)
+            # replace expired connections so that the pool doesn't drop below its minimum size
+            missing = self._min_size - self._size
+            if missing > 0:
+                await asyncio.gather(*(self.__fill() for _ in range(missing)), return_exceptions=True)
+
+    async def close(self) -> None:
+        """
+        Close all idle connections. Connections that are in use are closed when they are released.
+        """
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        while self._idle:
+            await self.__discard(self._idle.pop())
+
+    async def __aenter__(self) -> "Pool":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
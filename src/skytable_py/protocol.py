@@ -13,250 +13,607 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Union, List
+from typing import Any, BinaryIO, Union, List, Tuple
 from .exception import ProtocolException
-from .response import Value, UInt8, UInt16, UInt32, UInt64, SInt8, SInt16, SInt32, SInt64, Float32, Float64, Empty, \
-    ErrorCode, Row, Response
+from .response import Value, Empty, ErrorCode, Row, Response, _LazyValue, _tagged, _TAG_LIST, _response, \
+    _parse_int, _parse_float, \
+    _RESPONSE_ROW, _RESPONSE_ROWS
+from .rows import RowFactory
+
+
+# aggregate kinds
+_AGGREGATE_LIST = 0
+_AGGREGATE_ROW = 1
+_AGGREGATE_ROWS = 2
+# marker returned when an aggregate was opened instead of a complete element being decoded
+_OPENED = object()
+# marker returned when there isn't enough data to decode an element (since `None` is a valid decoded value)
+_INCOMPLETE = object()
+
+
+# initial capacity of the receive buffer
+_INITIAL_CAPACITY = 4096
+# receive buffers larger than this are released once a response has been decoded
+_RETAINED_CAPACITY = 1 << 20
+# strings and binaries at least this large are received outside of the receive buffer
+_LARGE_BLOB = 1 << 16
+# size of the chunks in which a blob is written to a file-like sink
+_SINK_CHUNK = 1 << 16
+
+
+class _Aggregate:
+    """
+    A partially decoded list, row or multi-row. If `native` is set, its elements are plain Python values and it
+    finishes as a plain list, or as whatever `factory` builds from that list.
+    """
+    __slots__ = ("kind", "size", "native", "factory", "items", "streamed", "start")
+
+    def __init__(self, kind: int, size: int, native: bool, start: int,
+                 factory: Union[None, RowFactory] = None) -> None:
+        self.kind = kind
+        self.size = size
+        self.native = native
+        self.factory = factory
+        self.items = []
+        # rows that were handed out while streaming instead of being kept in `items`
+        self.streamed = 0
+        self.start = start
+
+    def decoded_count(self) -> int:
+        return len(self.items) + self.streamed
+
+    def finish(self) -> Union[list, Value, Row, List[Row], Any]:
+        if self.native:
+            return self.items if self.factory is None else self.factory(self.items)
+        elif self.kind == _AGGREGATE_LIST:
+            return _tagged(_TAG_LIST, self.items)
+        elif self.kind == _AGGREGATE_ROW:
+            return Row(self.items)
+        else:
+            return self.items
+
+
+class _Blob:
+    """
+    A large string or binary being received. Its bytes are written straight into a buffer of its declared size, or
+    into a sink.
+    """
+    __slots__ = ("type_symbol", "size", "received", "buffer", "file", "overflow")
+
+    def __init__(self, type_symbol: int, size: int, sink: Union[None, BinaryIO, memoryview, bytearray],
+                 sink_offset: int) -> None:
+        self.type_symbol = type_symbol
+        self.size = size
+        self.received = 0
+        self.file = None
+        self.overflow = False
+        if sink is None:
+            self.buffer = bytearray(size)
+        elif hasattr(sink, "write"):
+            self.file = sink
+            self.buffer = bytearray(min(size, _SINK_CHUNK))
+        elif len(sink) - sink_offset >= size:
+            self.buffer = memoryview(sink)[sink_offset:sink_offset + size]
+        else:
+            # doesn't fit, so it's received into a scratch buffer and dropped
+            self.overflow = True
+            self.buffer = bytearray(min(size, _SINK_CHUNK))
+
+    def view(self) -> memoryview:
+        if self.file is None and not self.overflow:
+            return memoryview(self.buffer)[self.received:]
+        return memoryview(self.buffer)[:self.size - self.received]
+
+    def updated(self, nbytes: int) -> None:
+        if self.file is not None:
+            with memoryview(self.buffer) as view:
+                self.file.write(view[:nbytes])
+        self.received += nbytes
 
 
 class Protocol:
-    def __init__(self, buffer=bytes()) -> None:
-        self._buffer = buffer
+    """
+    An incremental Skyhash/2 response decoder.
+
+    Received bytes are written into a preallocated `bytearray` and decoded in place using a cursor. Consumed bytes
+    are discarded by moving the undecoded tail to the front of the buffer, so the same buffer is reused for every
+    response on a connection.
+
+    In lazy mode, numbers, strings and binaries are not decoded. Values only record where they are in the buffer and
+    are decoded when they are first accessed. A buffer that such values point into is never modified again and
+    the undecoded tail is moved to a new buffer instead.
+
+    If a row factory is set, top-level rows and the rows of a multi-row are decoded straight into plain Python values
+    and handed to the factory, so no `Row` or `Value` is created for them.
+
+    Strings and binaries of at least 64 KiB that haven't been received in full are not copied through the receive
+    buffer. The rest of their bytes are written straight into a buffer of their declared size (see `get_buffer`).
+    """
+
+    def __init__(self, buffer=bytes(), lazy: bool = False) -> None:
+        self._buffer = bytearray(max(len(buffer), _INITIAL_CAPACITY))
+        self._buffer[:len(buffer)] = buffer
+        self._end = len(buffer)
         self._cursor = 0
+        # number of bytes discarded from the front of the stream so far
+        self._discarded = 0
+        # number of bytes still missing from a string or binary that is being received
+        self._need = 0
+        self._stack = []
+        # when streaming, rows of a top-level multi-row are moved here instead of being collected
+        self._row_stream = None
+        self._native_rows = False
+        # if set, rows are decoded into plain Python values and passed to this instead of building a `Row`
+        self._row_factory = None
+        # kind of the aggregate that the last top-level element was decoded from
+        self._finished_kind = None
+        self._lazy = lazy
+        # set if lazy values point into the current buffer
+        self._buffer_shared = False
+        # a large string or binary that is being received outside of the receive buffer
+        self._blob = None
+        self._blob_sink = None
+        self._sink_offset = 0
+        self._sink_blobs = 0
+        self._sink_overflow = False
+
+    def _reset(self) -> None:
+        """
+        Discard everything received so far, including a partially decoded response, so that the protocol can be used
+        on a new connection. Settings such as the row factory are kept.
+        """
+        if self._buffer_shared or len(self._buffer) > _RETAINED_CAPACITY:
+            self._buffer = bytearray(_INITIAL_CAPACITY)
+        self._end = 0
+        self._cursor = 0
+        self._discarded = 0
+        self._need = 0
+        self._stack = []
+        self._row_stream = None
+        self._native_rows = False
+        self._finished_kind = None
+        self._buffer_shared = False
+        self._blob = None
+        self._blob_sink = None
 
     def push_additional_bytes(self, additional_bytes: bytes) -> None:
-        self._buffer = self._buffer + additional_bytes
+        size = len(additional_bytes)
+        written = 0
+        # a large string or binary may take only part of the data
+        while written < size:
+            with self.get_buffer(size - written) as view:
+                n = min(len(view), size - written)
+                view[:n] = additional_bytes[written:written + n]
+            self.buffer_updated(n)
+            written += n
+
+    def get_buffer(self, size_hint: int) -> memoryview:
+        """
+        Return a writable view of at least `size_hint` free bytes at the end of the receive buffer.
+
+        While a large string or binary is being received, this instead returns a view of its remaining bytes (or of
+        a chunk of them, for a file-like sink), which can be smaller than `size_hint`.
+
+        The view must be released before the next call into the protocol, and `buffer_updated` must be called with
+        the number of bytes that were written into it.
+        """
+        blob = self._blob
+        if blob is not None and blob.received < blob.size:
+            return blob.view()
+        self.__compact()
+        if len(self._buffer) - self._end < size_hint:
+            self.__grow(self._end + size_hint)
+        return memoryview(self._buffer)[self._end:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        blob = self._blob
+        if blob is not None and blob.received < blob.size:
+            blob.updated(nbytes)
+            # the blob's bytes never enter the buffer, so they count as discarded
+            self._discarded += nbytes
+            return
+        self._end += nbytes
+        self._need = max(self._need - nbytes, 0)
+
+    def _received(self) -> int:
+        # total number of bytes pushed into the protocol so far
+        return self._discarded + self._end
+
+    def bytes_needed(self) -> int:
+        """
+        Return an estimate of how many more bytes are needed to complete the current response (`0` if unknown).
+
+        This is exact for a pending string or binary, and for multi-rows it is extrapolated from the average size
+        of the rows that have already been decoded.
+        """
+        estimate = self._need
+        if self._blob is not None:
+            estimate = self._blob.size - self._blob.received
+        for aggregate in self._stack:
+            decoded_rows = aggregate.decoded_count()
+            if aggregate.kind == _AGGREGATE_ROWS and decoded_rows:
+                decoded = self._discarded + self._cursor - aggregate.start
+                remaining_rows = aggregate.size - decoded_rows
+                estimate = max(estimate, decoded // decoded_rows * remaining_rows)
+        return estimate
+
+    def _missing_bytes(self) -> int:
+        # bytes of a pending string or binary that have to arrive before decoding can make progress
+        if self._blob is not None:
+            return self._blob.size - self._blob.received
+        return self._need
+
+    def _take(self, count: int) -> Union[None, bytes]:
+        # consume `count` raw bytes, such as a handshake response
+        if self.__remaining() < count:
+            return None
+        data = bytes(self._buffer[self._cursor:self._cursor + count])
+        self.__increment_cursor_by(count)
+        return data
 
     def __step(self) -> int:
-        ret = self.__buf()[0]
+        ret = self._buffer[self._cursor]
         self.__increment_cursor()
         return ret
 
-    def __decrement(self) -> None:
-        self._cursor -= 1
-
     def __increment_cursor_by(self, by: int) -> None:
         self._cursor += by
 
     def __increment_cursor(self) -> None:
         self.__increment_cursor_by(1)
 
-    def __buf(self) -> bytes:
-        return self._buffer[self._cursor:]
-
     def __remaining(self) -> int:
-        return len(self.__buf())
+        return self._end - self._cursor
 
     def __is_eof(self) -> bool:
-        return self.__remaining() == 0
+        return self._cursor >= self._end
+
+    def __compact(self) -> None:
+        # move the undecoded tail to the front of the buffer
+        cursor = self._cursor
+        if cursor:
+            remaining = self._end - cursor
+            if self._buffer_shared:
+                # lazy values still point into this buffer, so leave it untouched
+                buffer = bytearray(max(remaining, _INITIAL_CAPACITY))
+                buffer[:remaining] = self._buffer[cursor:self._end]
+                self._buffer = buffer
+                self._buffer_shared = False
+            elif remaining:
+                self._buffer[:remaining] = self._buffer[cursor:self._end]
+            self._discarded += cursor
+            self._end = remaining
+            self._cursor = 0
+
+    def __grow(self, min_capacity: int) -> None:
+        buffer = bytearray(max(2 * len(self._buffer), min_capacity))
+        with memoryview(self._buffer) as view:
+            buffer[:self._end] = view[:self._end]
+        self._buffer = buffer
 
     def parse_next_int(self, stop_symbol='\n') -> Union[None, int]:
-        i = 0
-        integer = 0
-        stop = False
-        buffer = self.__buf()
-
-        while i < len(buffer) and not stop:
-            digit = None
-            if 48 <= buffer[i] <= 57:
-                digit = buffer[i] - 48
-
-            if digit is not None:
-                integer = (10 * integer) + digit
-                i += 1
-            else:
-                raise ProtocolException("invalid response from server")
-
-            if i < len(buffer) and buffer[i] == ord(stop_symbol):
-                stop = True
-
-        if stop:
-            self.__increment_cursor_by(i)
-            self.__increment_cursor()  # for LF
-            return integer
+        digits = self.__take_until(ord(stop_symbol))
+        if digits is None:
+            return None
+        return _parse_int(digits, False)
 
-    def parse_next_string(self) -> Union[None, Value]:
-        strlen = self.parse_next_int()
-        if strlen:
-            if self.__remaining() >= strlen:
-                string = self.__buf()[:strlen].decode()
-                self.__increment_cursor_by(strlen)
-                return Value(string)
+    def __take_until(self, stop_byte: int = 10) -> Union[None, bytearray]:
+        # consume the bytes up to and including the next `stop_byte` (LF by default), returning them without it
+        start = self._cursor
+        stop = self._buffer.find(stop_byte, start, self._end)
+        if stop == -1:
+            return None
+        self._cursor = stop + 1
+        return self._buffer[start:stop]
 
-    def parse_next_binary(self) -> Union[None, Value]:
-        binlen = self.parse_next_int()
-        if binlen:
-            if self.__remaining() >= binlen:
-                blob = self.__buf()[:binlen]
-                self.__increment_cursor_by(binlen)
-                return Value(blob)
+    def __decode_string(self) -> Union[object, str]:
+        return self.__decode_sized(13)
 
-    def parse_boolean(self) -> Union[None, Value]:
-        # boolean
+    def __decode_binary(self) -> Union[object, bytes]:
+        return self.__decode_sized(12)
+
+    def __decode_sized(self, type_symbol: int) -> Union[object, bytes, str]:
+        size = self.parse_next_int()
+        if size is None:
+            return _INCOMPLETE
+        remaining = self.__remaining()
+        if self._blob_sink is not None or (size >= _LARGE_BLOB and remaining < size):
+            return self.__start_blob(type_symbol, size)
+        if remaining < size:
+            self._need = size - remaining
+            return _INCOMPLETE
+        with memoryview(self._buffer) as view:
+            raw = view[self._cursor:self._cursor + size]
+            value = bytes(raw) if type_symbol == 12 else str(raw, "utf-8")
+        self.__increment_cursor_by(size)
+        return value
+
+    def __start_blob(self, type_symbol: int, size: int) -> Union[object, int, bytes, str]:
+        # receive a large string or binary outside of the receive buffer, starting with the bytes already in it
+        blob = _Blob(type_symbol, size, self._blob_sink, self._sink_offset)
+        if blob.overflow:
+            self._sink_overflow = True
+        self._blob = blob
+        available = min(self.__remaining(), size)
+        with memoryview(self._buffer) as buffer:
+            while blob.received < available:
+                with blob.view() as view:
+                    n = min(len(view), available - blob.received)
+                    view[:n] = buffer[self._cursor:self._cursor + n]
+                blob.updated(n)
+                self.__increment_cursor_by(n)
+        if blob.received < size:
+            return _INCOMPLETE
+        return self.__finish_blob()
+
+    def __finish_blob(self) -> Union[int, bytes, str]:
+        blob = self._blob
+        self._blob = None
+        if self._blob_sink is not None:
+            self._sink_offset += blob.size
+            self._sink_blobs += 1
+            return blob.size
+        return bytes(blob.buffer) if blob.type_symbol == 12 else str(blob.buffer, "utf-8")
+
+    def _begin_blob_sink(self, sink: Union[BinaryIO, memoryview, bytearray]) -> None:
+        """
+        Write every string and binary in the next response to `sink`, which is either a file-like object or a
+        writable buffer, instead of decoding them. They decode to their length. If a buffer is too small, the
+        data that doesn't fit is discarded and `_end_blob_sink` reports the overflow.
+        """
+        self._blob_sink = sink
+        self._sink_offset = 0
+        self._sink_blobs = 0
+        self._sink_overflow = False
+
+    def _end_blob_sink(self) -> Tuple[int, int, bool]:
+        # returns the number of bytes and blobs written to the sink, and whether any of them didn't fit
+        written = (self._sink_offset, self._sink_blobs, self._sink_overflow)
+        self._blob_sink = None
+        return written
+
+    def __decode_boolean(self) -> Union[object, bool]:
         if self.__is_eof():
-            self.__decrement()  # move back to type symbol
-            return None
-        else:
-            byte = self.__step()
-            if byte > 1:
-                raise ProtocolException("received invalid data")
-            return Value(True) if byte == 1 else Value(False)
+            return _INCOMPLETE
+        byte = self.__step()
+        if byte > 1:
+            raise ProtocolException("received invalid data")
+        return byte == 1
 
-    def parse_uint(self, type_symbol: int) -> Union[None, Value]:
-        # uint
+    def __decode_uint(self) -> Union[object, int]:
         integer = self.parse_next_int()
-        if integer:
-            if type_symbol == 2:
-                return Value(UInt8(integer))
-            elif type_symbol == 3:
-                return Value(UInt16(integer))
-            elif type_symbol == 4:
-                return Value(UInt32(integer))
-            else:
-                return Value(UInt64(integer))
-        else:
-            self.__decrement()  # move back to type symbol
+        return _INCOMPLETE if integer is None else integer
 
-    def parse_sint(self, type_symbol: int) -> Union[None, Value]:
-        # sint
-        if self.__is_eof():
-            self.__decrement()  # move back to type symbol
+    def __decode_sint(self) -> Union[object, int]:
+        digits = self.__take_until()
+        if digits is None:
+            return _INCOMPLETE
+        return _parse_int(digits, True)
+
+    def __decode_float(self) -> Union[object, float]:
+        digits = self.__take_until()
+        if digits is None:
+            return _INCOMPLETE
+        return _parse_float(digits)
+
+    def __decode_scalar(self, type_symbol: int) -> Union[object, None, bool, int, float, bytes, str]:
+        if type_symbol == 0:
+            # null
             return None
-        is_negative = False
-        if self.__step() == ord('-'):
-            is_negative = True
+        elif type_symbol == 1:
+            return self.__decode_boolean()
+        elif type_symbol <= 5:
+            return self.__decode_uint()
+        elif type_symbol <= 9:
+            return self.__decode_sint()
+        elif type_symbol <= 11:
+            return self.__decode_float()
+        elif type_symbol == 12:
+            return self.__decode_binary()
         else:
-            self.__decrement()  # move back to integer starting position since there is no '-'
-        integer = self.parse_next_int()
-        if integer:
-            if is_negative:
-                integer = -integer
-            if type_symbol == 6:
-                return Value(SInt8(integer))
-            elif type_symbol == 7:
-                return Value(SInt16(integer))
-            elif type_symbol == 8:
-                return Value(SInt32(integer))
-            else:
-                return Value(SInt64(integer))
+            return self.__decode_string()
+
+    def __skip_scalar(self, type_symbol: int) -> Union[object, _LazyValue]:
+        # find the bounds of a number, string or binary without decoding it
+        if type_symbol >= 12:
+            size = self.parse_next_int()
+            if size is None:
+                return _INCOMPLETE
+            remaining = self.__remaining()
+            if self._blob_sink is not None or (size >= _LARGE_BLOB and remaining < size):
+                blob = self.__start_blob(type_symbol, size)
+                return blob if blob is _INCOMPLETE else _tagged(type_symbol, blob)
+            if remaining < size:
+                self._need = size - remaining
+                return _INCOMPLETE
+            start = self._cursor
+            self.__increment_cursor_by(size)
         else:
-            self.__decrement()  # move back to type symbol
-            if is_negative:
-                self.__decrement()  # move back to starting position of this integer
+            start = self._cursor
+            stop = self._buffer.find(b"\n", start, self._end)
+            if stop == -1:
+                return _INCOMPLETE
+            size = stop - start
+            self.__increment_cursor_by(size + 1)
+        self._buffer_shared = True
+        return _LazyValue(self._buffer, type_symbol, start, start + size)
+
+    def parse_next_string(self) -> Union[None, Value]:
+        string = self.__decode_string()
+        if string is not _INCOMPLETE:
+            return _tagged(13, string)
+
+    def parse_next_binary(self) -> Union[None, Value]:
+        blob = self.__decode_binary()
+        if blob is not _INCOMPLETE:
+            return _tagged(12, blob)
+
+    def parse_boolean(self) -> Union[None, Value]:
+        boolean = self.__decode_boolean()
+        if boolean is not _INCOMPLETE:
+            return _tagged(1, boolean)
+
+    def parse_uint(self, type_symbol: int) -> Union[None, Value]:
+        integer = self.__decode_uint()
+        if integer is not _INCOMPLETE:
+            return _tagged(type_symbol, integer)
+
+    def parse_sint(self, type_symbol: int) -> Union[None, Value]:
+        integer = self.__decode_sint()
+        if integer is not _INCOMPLETE:
+            return _tagged(type_symbol, integer)
 
     def parse_float(self, type_symbol: int) -> Union[None, Value]:
-        if self.__is_eof():
-            self.__decrement()  # move back to type symbol
-            return None
-        is_negative = False
-        if self.__step() == ord('-'):
-            is_negative = True
-        else:
-            self.__decrement()  # move back to float starting position since there is no '-'
-        whole = self.parse_next_int(stop_symbol='.')
-        if whole:
-            decimal = self.parse_next_int()
-            if decimal:
-                full_float = float(f"{whole}.{decimal}")
-                if is_negative:
-                    full_float = -full_float
-                if type_symbol == 10:
-                    return Value(Float32(full_float))
-                else:
-                    return Value(Float64(full_float))
-        self.__decrement()  # type symbol
-        if is_negative:
-            self.__decrement()
+        full_float = self.__decode_float()
+        if full_float is not _INCOMPLETE:
+            return _tagged(type_symbol, full_float)
 
     def parse_error_code(self) -> Union[None, ErrorCode]:
         if self.__remaining() < 2:
-            self.__decrement()  # type symbol
-        else:
-            a, b = self.__buf()
-            self.__increment_cursor_by(2)
-            return ErrorCode(int.from_bytes([a, b], byteorder="little", signed=False))
-
-    def parse_list(self) -> Union[None, Value]:
-        cursor_start = self._cursor - 1
-        list_len = self.parse_next_int()
-        if list_len is None:
-            self.__decrement()  # type symbol
             return None
-        items = []
-        while len(items) != list_len:
-            element = self.parse_next_element()
-            if element:
-                items.append(element)
-            else:
-                self._cursor = cursor_start
-                return None
-        return Value(items)
+        a, b = self._buffer[self._cursor], self._buffer[self._cursor + 1]
+        self.__increment_cursor_by(2)
+        return ErrorCode(int.from_bytes([a, b], byteorder="little", signed=False))
 
-    def parse_row(self) -> Union[None, Row]:
-        cursor_start = self._cursor - 1
-        column_count = self.parse_next_int()
-        if column_count is None:
-            self.__decrement()  # type symbol
-            return None
-        columns = []
-        while len(columns) != column_count:
-            column = self.parse_next_element()
-            if column:
-                columns.append(column)
-            else:
-                self._cursor = cursor_start
-                return None
-        return Row(columns)
-
-    def parse_rows(self) -> Union[None, List[Row]]:
-        cursor_start = self._cursor - 1
-        row_count = self.parse_next_int()
-        rows = []
-        while len(rows) != row_count:
-            row = self.parse_row()
-            if row:
-                rows.append(row)
-            else:
-                self._cursor = cursor_start
-                return None
+    def __open_aggregate(self, kind: int, native: bool, factory: Union[None, RowFactory] = None) -> bool:
+        size = self.parse_next_int()
+        if size is None:
+            return False
+        self._stack.append(_Aggregate(kind, size, native, self._discarded + self._cursor, factory))
+        return True
+
+    def _begin_row_stream(self, native: bool = False) -> None:
+        """
+        Stream the rows of the next multi-row response instead of collecting them. Decoded rows are picked up with
+        `_take_streamed_rows` and the multi-row itself decodes to an empty list.
+
+        If `native` is set, each row is decoded into a plain list of Python values instead of a `Row`.
+        """
+        self._row_stream = []
+        self._native_rows = native
+
+    def _take_streamed_rows(self) -> List[Union[Row, list]]:
+        rows = self._row_stream
+        self._row_stream = []
         return rows
 
-    def parse(self) -> Response:
-        e = self.parse_next_element()
-        if e:
+    def _end_row_stream(self) -> None:
+        self._row_stream = None
+        self._native_rows = False
+
+    def parse(self, row_factory: Union[None, RowFactory] = None) -> Union[None, Response]:
+        """
+        Decode the next response, returning `None` if more data is needed. If `row_factory` is given, it is used
+        instead of the protocol's own row factory for rows that start being decoded during this call.
+        """
+        if row_factory is None:
+            e = self.parse_next_element()
+        else:
+            default = self._row_factory
+            self._row_factory = row_factory
+            try:
+                e = self.parse_next_element()
+            finally:
+                self._row_factory = default
+        if e is not None:
+            self.__compact()
+            if len(self._buffer) > _RETAINED_CAPACITY and self._end <= _INITIAL_CAPACITY:
+                # don't hold on to the memory used by a large response
+                buffer = bytearray(_INITIAL_CAPACITY)
+                buffer[:self._end] = self._buffer[:self._end]
+                self._buffer = buffer
+            kind = self._finished_kind
+            self._finished_kind = None
+            if kind == _AGGREGATE_ROW:
+                return _response(_RESPONSE_ROW, e)
+            elif kind == _AGGREGATE_ROWS:
+                return _response(_RESPONSE_ROWS, e)
             return Response(e)
 
-    def parse_next_element(self) -> Union[None, Value, Empty, ErrorCode]:
-        if self.__is_eof():
+    def parse_next_element(self) -> Union[None, Value, Row, List[Row], Empty, ErrorCode]:
+        """
+        Decode the next element from the buffer, returning `None` if more data is needed.
+
+        Lists, rows and multi-rows are decoded using an explicit stack of partially built aggregates that is
+        retained across calls. If the data runs out halfway through an aggregate, every element decoded so far is
+        kept and decoding resumes from the first undecoded element once more data has been pushed.
+        """
+        if self._need:
+            # still waiting for the rest of a string or binary
             return None
+        stack = self._stack
+        if self._blob is not None:
+            if self._blob.received < self._blob.size:
+                return None
+            type_symbol = self._blob.type_symbol
+            element = self.__finish_blob()
+            if not (stack and stack[-1].native):
+                element = _tagged(type_symbol, element)
+            if not stack:
+                return element
+            stack[-1].items.append(element)
+        while True:
+            if stack:
+                aggregate = stack[-1]
+                if aggregate.decoded_count() == aggregate.size:
+                    stack.pop()
+                    element = aggregate.finish()
+                    if not stack:
+                        self._finished_kind = aggregate.kind
+                        return element
+                    if self._row_stream is not None and len(stack) == 1 and stack[0].kind == _AGGREGATE_ROWS:
+                        self._row_stream.append(element)
+                        stack[0].streamed += 1
+                    else:
+                        stack[-1].items.append(element)
+                    continue
+                if aggregate.kind == _AGGREGATE_ROWS:
+                    # each row in a multi-row response only has a column count and no type symbol
+                    factory = None if self._native_rows or len(stack) > 1 else self._row_factory
+                    native = (self._native_rows or factory is not None) and len(stack) == 1
+                    if not self.__open_aggregate(_AGGREGATE_ROW, native, factory):
+                        return None
+                    continue
+            if self.__is_eof():
+                return None
+            start = self._cursor
+            element = self.__parse_next_element(bool(stack) and stack[-1].native)
+            if element is _INCOMPLETE:
+                if self._blob is None:
+                    # rewind to the type symbol
+                    self._cursor = start
+                return None
+            if element is _OPENED:
+                continue
+            if not stack:
+                return element
+            stack[-1].items.append(element)
+
+    def __parse_next_element(self, native: bool) -> Union[object, None, bool, int, float, bytes, str, Value, Empty,
+                                                          ErrorCode]:
         type_symbol = self.__step()
-        if type_symbol == 0:
-            # null
-            return Value(None)
-        elif type_symbol == 1:
-            return self.parse_boolean()
-        elif 2 <= type_symbol <= 5:
-            return self.parse_uint(type_symbol)
-        elif 6 <= type_symbol <= 9:
-            return self.parse_sint(type_symbol)
-        elif 10 <= type_symbol <= 11:
-            return self.parse_float(type_symbol)
-        elif type_symbol == 12:
-            return self.parse_next_binary()
-        elif type_symbol == 13:
-            return self.parse_next_string()
+        if type_symbol <= 13:
+            if self._lazy and not native and type_symbol >= 2:
+                return self.__skip_scalar(type_symbol)
+            scalar = self.__decode_scalar(type_symbol)
+            if native or scalar is _INCOMPLETE:
+                return scalar
+            return _tagged(type_symbol, scalar)
         elif type_symbol == 14:
-            return self.parse_list()
+            return _OPENED if self.__open_aggregate(_AGGREGATE_LIST, native) else _INCOMPLETE
         elif type_symbol == 15:
             raise ProtocolException("dictionaries are not supported yet")
         elif type_symbol == 16:
-            return self.parse_error_code()
+            error_code = self.parse_error_code()
+            return _INCOMPLETE if error_code is None else error_code
         elif type_symbol == 17:
-            return self.parse_row()
+            factory = None if self._stack or self._native_rows else self._row_factory
+            opened = self.__open_aggregate(_AGGREGATE_ROW, native or factory is not None, factory)
+            return _OPENED if opened else _INCOMPLETE
         elif type_symbol == 18:
             return Empty()
         elif type_symbol == 19:
-            return self.parse_rows()
+            return _OPENED if self.__open_aggregate(_AGGREGATE_ROWS, False) else _INCOMPLETE
         else:
             raise ProtocolException(
                 f"unknown type with code {type_symbol} sent by server")
@@ -14,28 +14,100 @@
 # limitations under the License.
 
 from abc import ABC
-from typing import Tuple
+from typing import Tuple, Iterable, Union
 # internal
 from .exception import ClientException
 
 
 class Query:
     def __init__(self, query: str, *argv) -> None:
-        self._buffer = query.encode()
+        self._buffer = bytearray(query.encode())
         self._param_cnt = 0
         self._q_window = len(self._buffer)
+        self._q_window_str = b"%d" % self._q_window
         for param in argv:
             self.add_param(param)
 
+    @staticmethod
+    def template(query: str, check_params: bool = False) -> "PreparedQuery":
+        """
+        Create a `PreparedQuery` for a query that is run many times with different parameters
+        """
+        return PreparedQuery(query, check_params)
+
     def add_param(self, param: any) -> None:
         payload, param_cnt = encode_parameter(param)
         self._param_cnt += param_cnt
-        self._buffer = self._buffer + payload
+        self._buffer += payload
 
     def get_param_count(self) -> int:
         return self._param_cnt
 
 
+class PreparedQuery:
+    """
+    A query whose text has been encoded once, so that it can be cheaply bound to parameters over and over again:
+
+    ```python
+    select_user = Query.template("select * from apps.auth where username = ?")
+    resp = await db.run_simple_query(select_user.bind("sayan"))
+    ```
+
+    If `check_params` is set, `bind` raises a `ClientException` if the number of parameters doesn't match the number
+    of `?` placeholders in the query.
+    """
+
+    def __init__(self, query: str, check_params: bool = False) -> None:
+        self._query = query.encode()
+        self._q_window = len(self._query)
+        self._q_window_str = b"%d" % self._q_window
+        self._expected_param_cnt = self._query.count(b"?") if check_params else None
+
+    def get_expected_param_count(self) -> Union[None, int]:
+        return self._expected_param_cnt
+
+    def bind(self, *argv) -> Query:
+        query = Query.__new__(Query)
+        query._buffer = bytearray(self._query)
+        query._q_window = self._q_window
+        query._q_window_str = self._q_window_str
+        param_cnt = 0
+        for param in argv:
+            payload, cnt = encode_parameter(param)
+            query._buffer += payload
+            param_cnt += cnt
+        query._param_cnt = param_cnt
+        if self._expected_param_cnt is not None and param_cnt != self._expected_param_cnt:
+            raise ClientException(f"expected {self._expected_param_cnt} parameters but got {param_cnt}")
+        return query
+
+
+class Pipeline:
+    """
+    A batch of queries that are sent to the server in a single packet. The server executes them in order and
+    returns one response per query.
+    """
+
+    def __init__(self, *queries: Query) -> None:
+        self._buffer = bytearray()
+        self._query_cnt = 0
+        for query in queries:
+            self.add_query(query)
+
+    def add_query(self, query: Query) -> None:
+        # <query window>\n<params size>\n<query><params>
+        self._buffer += b"%s\n%d\n" % (query._q_window_str, len(query._buffer) - query._q_window)
+        self._buffer += query._buffer
+        self._query_cnt += 1
+
+    def add_queries(self, queries: Iterable[Query]) -> None:
+        for query in queries:
+            self.add_query(query)
+
+    def get_query_count(self) -> int:
+        return self._query_cnt
+
+
 class SkyhashParameter(ABC):
     def encode_self(self) -> Tuple[bytes, int]: pass
 
@@ -0,0 +1,138 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import random
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, List, TypeVar, Union
+from .cache import ResultCache
+from .connection import Connection, _CONNECTION_ERRORS
+from .metrics import Metrics
+from .query import Query, Pipeline
+from .response import Response
+from .rows import RowFactory
+
+if TYPE_CHECKING:
+    from .config import Config
+
+T = TypeVar("T")
+
+
+class ReconnectingConnection:
+    """
+    A connection that reconnects after its socket fails. Use `Config.connect_reconnecting` to create one.
+
+    When a query fails because the connection dropped, the connection is closed and the failure is raised, unless
+    the query was marked `idempotent`, in which case it is run again on a new connection. Up to `max_retries`
+    attempts are made to reconnect (and to rerun an idempotent query), with exponential backoff starting at
+    `base_delay` and capped at `max_delay` seconds. Each delay is chosen at random up to that bound, so that many
+    clients don't reconnect at the same moment after a server restart.
+
+    If a query is cancelled, such as by `asyncio.wait_for` timing out, or fails for any other reason, the socket is
+    closed as well, since its response may still arrive. The next query runs on a new connection.
+
+    Settings such as the row factory are kept across reconnections.
+    """
+
+    def __init__(self, config: "Config", connection: Connection, max_retries: int, base_delay: float,
+                 max_delay: float) -> None:
+        self._config = config
+        self._connection = connection
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._broken = False
+        self._closed = False
+        self.reconnects = 0
+
+    def set_row_factory(self, row_factory: Union[None, RowFactory]) -> None:
+        self._connection.set_row_factory(row_factory)
+
+    def set_lazy_decoding(self, lazy: bool) -> None:
+        self._connection.set_lazy_decoding(lazy)
+
+    def set_metrics(self, metrics: Union[None, Metrics]) -> None:
+        self._connection.set_metrics(metrics)
+
+    def set_result_cache(self, cache: Union[None, ResultCache]) -> None:
+        self._connection.set_result_cache(cache)
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    async def run_simple_query(self, query: Query, row_factory: Union[None, RowFactory] = None,
+                               idempotent: bool = False) -> Response:
+        """
+        Run a query, rerunning it on a new connection if the connection drops and it is `idempotent`
+        """
+        return await self.__run(lambda db: db.run_simple_query(query, row_factory), idempotent)
+
+    async def run_pipeline(self, pipeline: Union[Pipeline, Iterable[Query]],
+                           row_factory: Union[None, RowFactory] = None, idempotent: bool = False) -> List[Response]:
+        """
+        Run a pipeline, rerunning all of it on a new connection if the connection drops and it is `idempotent`
+        """
+        if not isinstance(pipeline, Pipeline):
+            pipeline = Pipeline(*pipeline)
+        return await self.__run(lambda db: db.run_pipeline(pipeline, row_factory), idempotent)
+
+    async def __run(self, run: Callable[[Connection], Awaitable[T]], idempotent: bool) -> T:
+        retries = 0
+        while True:
+            if self._broken:
+                await self.__reconnect()
+            try:
+                return await run(self._connection)
+            except _CONNECTION_ERRORS:
+                self._broken = True
+                await self.__close_connection()
+                if not idempotent or retries >= self._max_retries:
+                    raise
+                retries += 1
+            except BaseException:
+                # cancelled (by a timeout, say) or failed halfway, so a response may still be in flight
+                self._broken = True
+                self._connection._writer.close()
+                raise
+
+    def __backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2 ** attempt))
+
+    async def __reconnect(self) -> None:
+        if self._closed:
+            raise ConnectionResetError("connection is closed")
+        error = None
+        for attempt in range(self._max_retries + 1):
+            await asyncio.sleep(self.__backoff(attempt))
+            try:
+                fresh = await self._config.connect()
+            except _CONNECTION_ERRORS as e:
+                error = e
+                continue
+            self._connection._replace_transport(fresh._reader, fresh._writer)
+            self._broken = False
+            self.reconnects += 1
+            return
+        raise error
+
+    async def __close_connection(self) -> None:
+        try:
+            await self._connection.close()
+        except _CONNECTION_ERRORS:
+            pass
+
+    async def close(self) -> None:
+        self._closed = True
+        if not self._broken:
+            await self.__close_connection()
@@ -13,63 +13,93 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import re
 from dataclasses import dataclass
-from typing import Union, List
-from .exception import ClientException
+from typing import Any, Union, List, Tuple
+from .exception import ClientException, ProtocolException
+
+# characters that int() and float() accept but the server never sends in a number
+_NOT_NUMERIC = re.compile(rb"[\s_+]")
+
+
+def _parse_int(digits: bytes, signed: bool) -> int:
+    if not (digits[1:] if signed and digits[:1] == b"-" else digits).isdigit():
+        raise ProtocolException("invalid response from server")
+    return int(digits)
+
+
+def _parse_float(digits: bytes) -> float:
+    # the server formats floats like Rust's `Display`, so `1`, `inf` and `NaN` are valid too
+    if _NOT_NUMERIC.search(digits) is not None:
+        raise ProtocolException("invalid response from server")
+    try:
+        return float(digits)
+    except ValueError:
+        raise ProtocolException("invalid response from server")
 
 
 @dataclass
 class UInt8:
+    __slots__ = ("inner",)
     inner: int
 
 
 @dataclass
 class UInt16:
+    __slots__ = ("inner",)
     inner: int
 
 
 @dataclass
 class UInt32:
+    __slots__ = ("inner",)
     inner: int
 
 
 @dataclass
 class UInt64:
+    __slots__ = ("inner",)
     inner: int
 
 
 @dataclass
 class SInt8:
+    __slots__ = ("inner",)
     inner: int
 
 
 @dataclass
 class SInt16:
+    __slots__ = ("inner",)
     inner: int
 
 
 @dataclass
 class SInt32:
+    __slots__ = ("inner",)
     inner: int
 
 
 @dataclass
 class SInt64:
+    __slots__ = ("inner",)
     inner: int
 
 
 @dataclass
 class Float32:
+    __slots__ = ("inner",)
     inner: float
 
 
 @dataclass
 class Float64:
+    __slots__ = ("inner",)
     inner: float
 
 
 class Empty:
-    pass
+    __slots__ = ()
 
     def __eq__(self, value: object) -> bool:
         if isinstance(value, Empty):
@@ -77,56 +107,114 @@ class Empty:
         return False
 
 
+# a value is tagged with the type symbol of its element: 0 (null), 1 (bool), 2-9 (ints), 10-11 (floats),
+# 12 (binary), 13 (string) or 14 (list). Values built from any other type are tagged 15, and once the numeric
+# wrapper of a sized number has been created, it is kept as the data and the tag is offset by 16.
+_TAG_LIST = 14
+_TAG_OTHER = 15
+_WRAPPED = 16
+# the kind of data held by a value, by tag
+_KIND_NULL, _KIND_BOOL, _KIND_INT, _KIND_FLOAT, _KIND_BINARY, _KIND_STRING, _KIND_LIST, _KIND_OTHER, \
+    _KIND_WRAPPED_INT, _KIND_WRAPPED_FLOAT = range(10)
+_KINDS = (
+    _KIND_NULL, _KIND_BOOL,
+    _KIND_INT, _KIND_INT, _KIND_INT, _KIND_INT, _KIND_INT, _KIND_INT, _KIND_INT, _KIND_INT,
+    _KIND_FLOAT, _KIND_FLOAT,
+    _KIND_BINARY, _KIND_STRING, _KIND_LIST, _KIND_OTHER,
+    None, None,
+    _KIND_WRAPPED_INT, _KIND_WRAPPED_INT, _KIND_WRAPPED_INT, _KIND_WRAPPED_INT,
+    _KIND_WRAPPED_INT, _KIND_WRAPPED_INT, _KIND_WRAPPED_INT, _KIND_WRAPPED_INT,
+    _KIND_WRAPPED_FLOAT, _KIND_WRAPPED_FLOAT,
+)
+# wrappers for the sized numeric types, by tag
+_WRAPPERS = (
+    None, None,
+    UInt8, UInt16, UInt32, UInt64, SInt8, SInt16, SInt32, SInt64,
+    Float32, Float64,
+    None, None, None, None,
+)
+_WRAPPER_TAGS = {wrapper: tag for tag, wrapper in enumerate(_WRAPPERS) if wrapper is not None}
+_PLAIN_TAGS = {type(None): 0, bool: 1, bytes: 12, str: 13, list: _TAG_LIST}
+
+
 class Value:
+    """
+    A single value in a response. Values are stored in a compact form: the plain Python data along with a small
+    integer tag for its type. The sized numeric wrapper in `repr` is only created when it is first asked for, and
+    is then kept, so changes to its `inner` are seen by `data`, `int` and `float`.
+    """
+    __slots__ = ("_tag", "_data")
+
     def __init__(self, value: Union[None, bool, UInt8, UInt16, UInt32, UInt64,
                                     SInt8, SInt16, SInt32, SInt64,
                                     Float32, Float64, bytes, str, list]):
         self.repr = value
 
+    @property
+    def repr(self) -> Union[None, bool, UInt8, UInt16, UInt32, UInt64, SInt8, SInt16, SInt32, SInt64, Float32,
+                            Float64, bytes, str, list]:
+        tag = self._tag
+        if tag >= _WRAPPED:
+            return self._data
+        wrapper = _WRAPPERS[tag]
+        if wrapper is None:
+            return self._data
+        wrapped = wrapper(self._data)
+        self._tag, self._data = tag + _WRAPPED, wrapped
+        return wrapped
+
+    @repr.setter
+    def repr(self, value: Union[None, bool, UInt8, UInt16, UInt32, UInt64, SInt8, SInt16, SInt32, SInt64, Float32,
+                                Float64, bytes, str, list]) -> None:
+        tag = _PLAIN_TAGS.get(type(value))
+        if tag is None:
+            tag = _WRAPPER_TAGS.get(type(value))
+            if tag is not None:
+                tag += _WRAPPED
+            else:
+                tag = _subclass_tag(value)
+        self._tag, self._data = tag, value
+
     def is_null(self) -> bool:
-        return self.repr is None
+        return self._tag == 0
 
     def data(self) -> Union[None, bool, int, float, bytes, str, list]:
-        if self.repr is None:
-            return None
-        elif isinstance(self.repr, (UInt8, UInt16, UInt32, UInt64, SInt8, SInt16, SInt32, SInt64)):
-            return self.repr.inner
-        elif isinstance(self.repr, (Float32, Float64)):
-            return self.repr.inner
-        elif isinstance(self.repr, str):
-            return self.repr
-        elif isinstance(self.repr, bytes):
-            return self.repr
-        elif isinstance(self.repr, list):
-            return self.repr
-        elif isinstance(self.repr, bool):
-            return self.repr
-        else:
+        tag = self._tag
+        if tag < _TAG_OTHER:
+            return self._data
+        elif tag == _TAG_OTHER:
             raise ClientException("unknown type")
+        return self._data.inner
 
     def int(self) -> Union[None, int]:
-        if isinstance(self.repr, (UInt8, UInt16, UInt32, UInt64, SInt8, SInt16, SInt32, SInt64)):
-            return self.repr.inner
+        kind = _KINDS[self._tag]
+        if kind == _KIND_INT:
+            return self._data
+        elif kind == _KIND_WRAPPED_INT:
+            return self._data.inner
         return None
 
     def float(self) -> Union[None, float]:
-        if isinstance(self.repr, (Float32, Float64)):
-            return self.repr.inner
+        kind = _KINDS[self._tag]
+        if kind == _KIND_FLOAT:
+            return self._data
+        elif kind == _KIND_WRAPPED_FLOAT:
+            return self._data.inner
         return None
 
     def string(self) -> Union[None, str]:
-        if isinstance(self.repr, str):
-            return self.repr
+        if _KINDS[self._tag] == _KIND_STRING:
+            return self._data
         return None
 
     def binary(self) -> Union[None, bytes]:
-        if isinstance(self.repr, bytes):
-            return self.repr
+        if _KINDS[self._tag] == _KIND_BINARY:
+            return self._data
         return None
 
     def list(self) -> Union[None, list]:
-        if isinstance(self.repr, list):
-            return self.repr
+        if _KINDS[self._tag] == _KIND_LIST:
+            return self._data
         return None
 
     def __eq__(self, other):
@@ -135,7 +223,63 @@ class Value:
         return False
 
 
+def _subclass_tag(value: Any) -> int:
+    # the tag for a subclass of a supported type, or for a type that `data` will reject
+    for plain, tag in _PLAIN_TAGS.items():
+        if isinstance(value, plain):
+            return tag
+    for wrapper, tag in _WRAPPER_TAGS.items():
+        if isinstance(value, wrapper):
+            return tag + _WRAPPED
+    return _TAG_OTHER
+
+
+def _tagged(tag: int, data: Union[None, bool, int, float, bytes, str, list]) -> Value:
+    # build a value from already decoded data without inspecting its type
+    value = Value.__new__(Value)
+    value._tag = tag
+    value._data = data
+    return value
+
+
+class _LazyValue(Value):
+    """
+    A value that is only decoded from the response buffer when it is first accessed. Until then the `_data` slot is
+    left unset, so the first read falls through to `__getattr__`, which decodes and memoizes the data and drops the
+    reference to the buffer.
+    """
+    __slots__ = ("_buffer", "_start", "_end")
+
+    def __init__(self, buffer: bytearray, type_symbol: int, start: int, end: int) -> None:
+        self._buffer = buffer
+        self._tag = type_symbol
+        self._start = start
+        self._end = end
+
+    def __getattr__(self, name: str) -> Union[int, float, bytes, str]:
+        if name != "_data":
+            raise AttributeError(name)
+        data = self.__decode()
+        self._data = data
+        self._buffer = None
+        return data
+
+    def __decode(self) -> Union[int, float, bytes, str]:
+        tag = self._tag
+        with memoryview(self._buffer) as view:
+            raw = view[self._start:self._end]
+            if tag == 12:
+                return bytes(raw)
+            elif tag == 13:
+                return str(raw, "utf-8")
+            if tag >= 10:
+                return _parse_float(raw.tobytes())
+            return _parse_int(raw.tobytes(), tag >= 6)
+
+
 class Row:
+    __slots__ = ("columns",)
+
     def __init__(self, values: List[Value]) -> None:
         self.columns = values
 
@@ -147,28 +291,84 @@ class Row:
 
 @dataclass
 class ErrorCode:
+    __slots__ = ("inner",)
     inner: int
 
 
+# the kind of element held by a response
+_RESPONSE_EMPTY, _RESPONSE_VALUE, _RESPONSE_ROW, _RESPONSE_ROWS, _RESPONSE_ERROR, _RESPONSE_OTHER = range(6)
+_RESPONSE_KINDS = {Empty: _RESPONSE_EMPTY, Value: _RESPONSE_VALUE, _LazyValue: _RESPONSE_VALUE, Row: _RESPONSE_ROW,
+                   list: _RESPONSE_ROWS, ErrorCode: _RESPONSE_ERROR}
+
+
 class Response:
+    """
+    A response to a query. If a row factory was used, `row` and `rows` return whatever the factory built for each row.
+    """
+    __slots__ = ("_data", "_kind")
+
     def __init__(self, resp: Union[Empty, Value, Row, List[Row], ErrorCode]):
         self.data = resp
 
+    @property
+    def data(self) -> Union[Empty, Value, Row, List[Row], ErrorCode, List[Any], Any]:
+        return self._data
+
+    @data.setter
+    def data(self, resp: Union[Empty, Value, Row, List[Row], ErrorCode]) -> None:
+        kind = _RESPONSE_KINDS.get(type(resp))
+        if kind is None:
+            # a subclass, or a type that none of the accessors return
+            kind = next((kind for cls, kind in _RESPONSE_KINDS.items() if isinstance(resp, cls)), _RESPONSE_OTHER)
+        self._data = resp
+        self._kind = kind
+
     def is_empty(self) -> bool:
-        return isinstance(self.data, Empty)
+        return self._kind == _RESPONSE_EMPTY
 
     def value(self) -> Union[None, Value]:
-        if isinstance(self.data, Value):
-            return self.data
+        if self._kind == _RESPONSE_VALUE:
+            return self._data
 
-    def row(self) -> Union[None, Row]:
-        if isinstance(self.data, Row):
-            return self.data
+    def row(self) -> Union[None, Row, Any]:
+        if self._kind == _RESPONSE_ROW:
+            return self._data
 
-    def rows(self) -> Union[None, List[Row]]:
-        if isinstance(self.data, list):
-            return self.data
+    def rows(self) -> Union[None, List[Row], List[Any]]:
+        if self._kind == _RESPONSE_ROWS:
+            return self._data
 
     def error(self) -> Union[None, int]:
-        if isinstance(self.data, ErrorCode):
-            return self.data.inner
+        if self._kind == _RESPONSE_ERROR:
+            return self._data.inner
+
+
+def _response(kind: int, data: Any) -> Response:
+    # build a response for an element whose kind is already known
+    resp = Response.__new__(Response)
+    resp._data = data
+    resp._kind = kind
+    return resp
+
+
+class BatchSummary:
+    """
+    The outcome of `Connection.execute_many`. `errors` holds an `(index, error code)` pair for every parameter set
+    that failed, where `index` is its position in the input.
+    """
+
+    def __init__(self) -> None:
+        self.executed = 0
+        self.errors: List[Tuple[int, int]] = []
+
+    def _record(self, resp: Response) -> None:
+        error = resp.error()
+        if error is not None:
+            self.errors.append((self.executed, error))
+        self.executed += 1
+
+    def succeeded(self) -> int:
+        return self.executed - len(self.errors)
+
+    def is_ok(self) -> bool:
+        return not self.errors
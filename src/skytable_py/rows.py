@@ -0,0 +1,50 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
+
+# a row factory is called with the plain Python values of a row's columns
+RowFactory = Callable[[List[Any]], Any]
+
+
+def tuple_row(values: List[Any]) -> Tuple[Any, ...]:
+    """
+    A row factory that returns each row as a tuple of plain Python values
+    """
+    return tuple(values)
+
+
+@lru_cache(maxsize=256)
+def dict_row(*names: str) -> Callable[[List[Any]], Dict[str, Any]]:
+    """
+    Return a row factory that returns each row as a `dict` mapping the given column names to values. Responses
+    don't carry column names, so they have to be listed in the order they were selected in.
+
+    The same names always give the same factory, so a `ResultCache` can share responses between calls.
+    """
+    def factory(values: List[Any]) -> Dict[str, Any]:
+        return dict(zip(names, values))
+    return factory
+
+
+@lru_cache(maxsize=256)
+def namedtuple_row(*names: str, typename: str = "Row") -> Callable[[List[Any]], Tuple[Any, ...]]:
+    """
+    Return a row factory that returns each row as a named tuple with the given column names. As with `dict_row`,
+    the same names give the same factory.
+    """
+    return namedtuple(typename, names)._make
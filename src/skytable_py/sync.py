@@ -0,0 +1,133 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+from typing import BinaryIO, Union, Iterable, List
+from .connection import _MIN_READ_SIZE, _MAX_READ_SIZE, _simple_query_metaframe, _pipeline_metaframe, \
+    _blob_written
+from .query import Query, Pipeline
+from .protocol import Protocol
+from .response import Response
+from .rows import RowFactory
+
+
+class SyncConnection:
+    """
+    A blocking database connection to a Skytable instance, for use without an event loop. Use `Config.connect_sync`
+    to create one.
+
+    This uses the same query encoding and response decoding as `Connection`, but reads directly from the socket
+    into the decoder's buffer.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._socket = sock
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._protocol = Protocol()
+        # reused for every request so that the metaframe and dataframe are sent in a single call
+        self._send_buffer = bytearray()
+
+    def _send(self, metaframe: bytes, dataframe: bytes) -> None:
+        buffer = self._send_buffer
+        buffer.clear()
+        buffer += metaframe
+        buffer += dataframe
+        self._socket.sendall(buffer)
+
+    def _write_all(self, bytes: bytes) -> None:
+        self._socket.sendall(bytes)
+
+    def _read_exact(self, count: int) -> bytes:
+        buffer = bytearray(count)
+        with memoryview(buffer) as view:
+            read = 0
+            while read != count:
+                n = self._socket.recv_into(view[read:])
+                if n == 0:
+                    raise ConnectionResetError("connection closed by server")
+                read += n
+        return bytes(buffer)
+
+    def set_row_factory(self, row_factory: Union[None, RowFactory]) -> None:
+        """
+        Return rows as whatever `row_factory` builds from the plain Python values of their columns instead of as
+        `Row`s, for example `tuple_row`, `dict_row(...)` or `namedtuple_row(...)`. Pass `None` to get `Row`s again.
+        """
+        self._protocol._row_factory = row_factory
+
+    def set_lazy_decoding(self, lazy: bool) -> None:
+        """
+        If enabled, numbers, strings and binaries in responses are only decoded when they are first accessed. This is
+        useful when only a few columns of wide rows are read, but responses keep their receive buffer alive for as
+        long as any of their values haven't been accessed.
+        """
+        self._protocol._lazy = lazy
+
+    def close(self) -> None:
+        """
+        Close this connection
+        """
+        self._socket.close()
+
+    def __enter__(self) -> "SyncConnection":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def run_simple_query(self, query: Query, row_factory: Union[None, RowFactory] = None) -> Response:
+        """
+        Run a query and return its response. See `Connection.run_simple_query`.
+        """
+        self._send(_simple_query_metaframe(query), query._buffer)
+        return self._read_response(row_factory)
+
+    def run_pipeline(self, pipeline: Union[Pipeline, Iterable[Query]],
+                     row_factory: Union[None, RowFactory] = None) -> List[Response]:
+        """
+        Send a batch of queries to the server in a single write and return their responses in order. See
+        `Connection.run_pipeline`.
+        """
+        if not isinstance(pipeline, Pipeline):
+            pipeline = Pipeline(*pipeline)
+        self._send(_pipeline_metaframe(pipeline), pipeline._buffer)
+        return [self._read_response(row_factory) for _ in range(pipeline.get_query_count())]
+
+    def read_blob_into(self, query: Query, sink: Union[BinaryIO, memoryview, bytearray]) -> int:
+        """
+        Run a query that returns a binary or string and write its bytes straight into `sink`, returning the number
+        of bytes written. See `Connection.read_blob_into`.
+        """
+        self._protocol._begin_blob_sink(sink)
+        try:
+            self._send(_simple_query_metaframe(query), query._buffer)
+            resp = self._read_response()
+        finally:
+            written = self._protocol._end_blob_sink()
+        return _blob_written(resp, written)
+
+    def _read_response(self, row_factory: Union[None, RowFactory] = None) -> Response:
+        read_size = _MIN_READ_SIZE
+        while True:
+            resp = self._protocol.parse(row_factory)
+            if resp is not None:
+                return resp
+            # the estimate for a multi-row can be far larger than anything worth reserving up front
+            with self._protocol.get_buffer(max(read_size, min(self._protocol.bytes_needed(), _MAX_READ_SIZE))) as view:
+                n = self._socket.recv_into(view)
+            if n == 0:
+                raise ConnectionResetError("connection closed by server")
+            self._protocol.buffer_updated(n)
+            read_size = min(2 * read_size, _MAX_READ_SIZE)
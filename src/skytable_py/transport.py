@@ -0,0 +1,171 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Iterable, Union
+from .connection import Connection, _MIN_READ_SIZE
+from .protocol import Protocol
+
+# reading is paused once this many received bytes haven't been decoded yet
+_PAUSE_SIZE = 1 << 18
+
+
+class _SkyhashProtocol(asyncio.BufferedProtocol):
+    """
+    An asyncio protocol that has the event loop receive straight into the buffer of a response decoder. It also
+    stands in for the `StreamReader` and `StreamWriter` of a `Connection`.
+
+    The connection's task is only woken up once the decoder can make progress, so no task runs while the rest of a
+    string or binary is being received. Reading is paused while too much data is waiting to be decoded, and resumed
+    once the connection asks for more, so a response that is consumed slowly isn't received in full up front.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = Protocol()
+        self._transport = None
+        # set while the connection waits for data
+        self._waiter = None
+        # set if data that can be decoded arrived since the connection last asked for more
+        self._pending = False
+        self._reading_paused = False
+        # set while writing is paused because the transport's buffer is full
+        self._drain_waiter = None
+        self._eof = False
+        self._lost = False
+        self._closed = asyncio.get_event_loop().create_future()
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self._transport = transport
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        decoder = self._decoder
+        # the hint is -1 with the default event loop
+        return decoder.get_buffer(max(sizehint, _MIN_READ_SIZE, min(decoder.bytes_needed(), _PAUSE_SIZE)))
+
+    def buffer_updated(self, nbytes: int) -> None:
+        decoder = self._decoder
+        decoder.buffer_updated(nbytes)
+        if not decoder._missing_bytes():
+            self._pending = True
+            self.__wake()
+        if decoder._end - decoder._cursor >= _PAUSE_SIZE and not self._reading_paused:
+            self._reading_paused = True
+            self._transport.pause_reading()
+
+    def eof_received(self) -> bool:
+        self._eof = True
+        self.__wake()
+        # close the transport
+        return False
+
+    def connection_lost(self, exc: Union[None, Exception]) -> None:
+        self._eof = True
+        self._lost = True
+        self.__wake()
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_exception(ConnectionResetError("connection lost"))
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    def pause_writing(self) -> None:
+        self._drain_waiter = asyncio.get_event_loop().create_future()
+
+    def resume_writing(self) -> None:
+        waiter = self._drain_waiter
+        self._drain_waiter = None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def __wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def _wait_for_data(self) -> None:
+        if self._pending:
+            # more arrived since the decoder last ran, for example while a stream's consumer was busy
+            self._pending = False
+            return
+        if self._reading_paused:
+            self._reading_paused = False
+            self._transport.resume_reading()
+        if self._eof:
+            raise ConnectionResetError("connection closed by server")
+        self._waiter = asyncio.get_event_loop().create_future()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+            self._pending = False
+
+    async def readexactly(self, count: int) -> bytes:
+        while True:
+            data = self._decoder._take(count)
+            if data is not None:
+                return data
+            if self._eof:
+                raise asyncio.IncompleteReadError(b"", count)
+            await self._wait_for_data()
+
+    def at_eof(self) -> bool:
+        return self._eof
+
+    def write(self, data: bytes) -> None:
+        self._transport.write(data)
+
+    def writelines(self, data: Iterable[bytes]) -> None:
+        self._transport.writelines(data)
+
+    async def drain(self) -> None:
+        if self._lost:
+            raise ConnectionResetError("connection lost")
+        if self._drain_waiter is not None:
+            # several tasks may wait for the same drain
+            await asyncio.shield(self._drain_waiter)
+
+    def is_closing(self) -> bool:
+        return self._transport.is_closing()
+
+    def close(self) -> None:
+        self._transport.close()
+
+    async def wait_closed(self) -> None:
+        await self._closed
+
+
+class BufferedConnection(Connection):
+    """
+    A `Connection` that receives through an `asyncio.BufferedProtocol` rather than a `StreamReader`. The event loop
+    writes incoming data straight into the response decoder's buffer, which saves a copy of every chunk, and the
+    connection is only woken up once a response can make progress. Use `Config(..., transport="buffered")` to
+    create one.
+    """
+
+    def __init__(self, stream: _SkyhashProtocol) -> None:
+        super().__init__(stream, stream)
+        # the event loop may already be receiving into the stream's decoder
+        self._protocol = stream._decoder
+
+    def _replace_transport(self, reader: _SkyhashProtocol, writer: _SkyhashProtocol) -> None:
+        super()._replace_transport(reader, writer)
+        reader._decoder = self._protocol
+
+    async def _read_more(self, read_size: int) -> int:
+        await self._reader._wait_for_data()
+        return read_size
+
+
+async def _open_buffered_connection(host: str, port: int) -> BufferedConnection:
+    _, stream = await asyncio.get_event_loop().create_connection(_SkyhashProtocol, host, port)
+    return BufferedConnection(stream)
@@ -0,0 +1,126 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import socket
+import unittest
+from src.skytable_py import Config, Query
+from src.skytable_py.emulator import Emulator, encode_value
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def dropping_listener(port: int = 0) -> asyncio.AbstractServer:
+    # accepts connections, reads the handshake and closes them, like an instance that is restarting
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await reader.read(1024)
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", port)
+
+
+class BalancedPoolTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.servers = [await Emulator(lambda query: encode_value("a"), latency=0.05).start(),
+                        await Emulator(lambda query: encode_value("b")).start()]
+
+    async def asyncTearDown(self):
+        for server in self.servers:
+            await server.stop()
+
+    def config(self, *ports: int) -> Config:
+        return Config("root", "password", endpoints=[("127.0.0.1", port) for port in ports])
+
+    async def test_least_outstanding(self):
+        config = self.config(*(server.port for server in self.servers))
+        async with await config.create_balanced_pool(max_size=10) as pool:
+            await asyncio.gather(*(pool.run_simple_query(Query("select")) for _ in range(10)))
+        self.assertEqual([len(server.queries) for server in self.servers], [5, 5])
+
+    async def test_ewma(self):
+        config = self.config(*(server.port for server in self.servers))
+        async with await config.create_balanced_pool("ewma") as pool:
+            answers = [(await pool.run_simple_query(Query("select"))).value().string() for _ in range(10)]
+        # each instance is tried once, and then the faster one is used
+        self.assertEqual(answers.count("a"), 1)
+
+    async def test_failover_and_probe(self):
+        port = unused_port()
+        config = self.config(port, self.servers[1].port)
+        async with await config.create_balanced_pool(probe_interval=0.05) as pool:
+            self.assertEqual(pool.get_endpoints(), [("127.0.0.1", port, False),
+                                                    ("127.0.0.1", self.servers[1].port, True)])
+            resp = await pool.run_simple_query(Query("select"))
+            self.assertEqual(resp.value().string(), "b")
+            revived = await Emulator(lambda query: encode_value("c"), port=port).start()
+            try:
+                await asyncio.sleep(0.2)
+                self.assertTrue(pool.get_endpoints()[0][2])
+                answers = await asyncio.gather(*(pool.run_simple_query(Query("select")) for _ in range(4)))
+                self.assertIn("c", [resp.value().string() for resp in answers])
+            finally:
+                await pool.close()
+                await revived.stop()
+
+    async def test_handshake_dropped(self):
+        dropping = await dropping_listener()
+        port = dropping.sockets[0].getsockname()[1]
+        config = self.config(port, self.servers[1].port)
+        async with await config.create_balanced_pool(probe_interval=0.05) as pool:
+            self.assertEqual(pool.get_endpoints()[0], ("127.0.0.1", port, False))
+            resp = await pool.run_simple_query(Query("select"))
+            self.assertEqual(resp.value().string(), "b")
+            await asyncio.sleep(0.2)
+            self.assertFalse(pool._prober.done())
+            dropping.close()
+            await dropping.wait_closed()
+            revived = await Emulator(lambda query: encode_value("c"), port=port).start()
+            try:
+                await asyncio.sleep(0.2)
+                self.assertTrue(pool.get_endpoints()[0][2])
+            finally:
+                await pool.close()
+                await revived.stop()
+
+    async def test_connect_failover_handshake_dropped(self):
+        dropping = await dropping_listener()
+        try:
+            db = await self.config(dropping.sockets[0].getsockname()[1], self.servers[1].port).connect()
+            self.assertEqual((await db.run_simple_query(Query("select"))).value().string(), "b")
+            await db.close()
+            config = self.config(dropping.sockets[0].getsockname()[1], self.servers[1].port)
+            # the blocking connection needs the event loop to keep serving both listeners
+            sync_db = await asyncio.get_running_loop().run_in_executor(None, config.connect_sync, 5)
+            sync_db.close()
+        finally:
+            dropping.close()
+            await dropping.wait_closed()
+
+    async def test_all_down(self):
+        with self.assertRaises(OSError):
+            await self.config(unused_port(), unused_port()).create_balanced_pool()
+
+    async def test_connect_failover(self):
+        db = await self.config(unused_port(), self.servers[1].port).connect()
+        self.assertEqual((await db.run_simple_query(Query("select"))).value().string(), "b")
+        await db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
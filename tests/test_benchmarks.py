@@ -0,0 +1,32 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from benchmarks import bench_encoding, bench_protocol  # noqa: F401 (registers the benchmarks)
+from benchmarks.harness import BENCHMARKS, run
+
+
+class BenchmarksTest(unittest.TestCase):
+    def test_benchmarks_run(self):
+        # run every benchmark once, so that they keep working as the library changes
+        for name, setup in BENCHMARKS.items():
+            with self.subTest(name):
+                setup()()
+
+    def test_results(self):
+        results = run(["pipeline/1000_queries"], min_time=0.01)
+        self.assertEqual(set(results["pipeline/1000_queries"]),
+                         {"ops_per_sec", "peak_bytes", "retained_bytes", "retained_blocks"})
+        self.assertGreater(results["pipeline/1000_queries"]["retained_bytes"], 0)
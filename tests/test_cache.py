@@ -0,0 +1,168 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from src.skytable_py import Query, Pipeline, ResultCache, UInt, tuple_row, dict_row
+from src.skytable_py.cache import _classify, _pipeline_statements, _READ, _WRITE, _REPORT, _OTHER
+from src.skytable_py.emulator import Emulator, EMPTY, encode_row, encode_error
+
+
+def respond(query: bytes) -> bytes:
+    if query.startswith(b"select * from apps.missing"):
+        return encode_error(111)
+    elif query.startswith(b"select"):
+        return encode_row(["sayan", 25])
+    return EMPTY
+
+
+class ClassifyTest(unittest.TestCase):
+    def test_classify(self):
+        self.assertEqual(_classify(b"select * from apps.users where username = ?"), (_READ, "apps.users"))
+        self.assertEqual(_classify(b"SELECT all username FROM Apps.Users LIMIT ?"), (_READ, "apps.users"))
+        self.assertEqual(_classify(b"insert into apps.users(?, ?)"), (_WRITE, "apps.users"))
+        self.assertEqual(_classify(b"upsert into apps.users(?, ?)"), (_WRITE, "apps.users"))
+        self.assertEqual(_classify(b"update apps.users set age += ? where username = ?"), (_WRITE, "apps.users"))
+        self.assertEqual(_classify(b"delete from users where username = ?"), (_WRITE, "users"))
+        self.assertEqual(_classify(b"sysctl report status"), (_REPORT, None))
+        self.assertEqual(_classify(b"inspect model apps.users"), (_REPORT, None))
+        self.assertEqual(_classify(b"drop model apps.users"), (_OTHER, None))
+
+    def test_pipeline_statements(self):
+        pipeline = Pipeline(Query("select * from a where x = ?", "1"), Query("delete from b where y = ?", 2.5))
+        self.assertEqual(list(_pipeline_statements(pipeline)),
+                         [b"select * from a where x = ?", b"delete from b where y = ?"])
+
+
+class ResultCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await Emulator(respond).start()
+        self.db = await self.server.config().connect()
+        self.cache = ResultCache(max_entries=2, ttl=60)
+        self.db.set_result_cache(self.cache)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        await self.server.stop()
+
+    async def select(self, username: str = "sayan", model: str = "apps.users"):
+        return await self.db.run_simple_query(Query(f"select * from {model} where username = ?", username))
+
+    async def test_hit(self):
+        first = await self.select()
+        self.assertIs(await self.select(), first)
+        await self.select("sophie")
+        self.assertEqual(len(self.server.queries), 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    async def test_row_factory_cached_separately(self):
+        await self.select()
+        resp = await self.db.run_simple_query(Query("select * from apps.users where username = ?", "sayan"),
+                                              row_factory=tuple_row)
+        self.assertEqual(resp.row(), ("sayan", 25))
+        self.assertEqual(len(self.server.queries), 2)
+
+    async def test_dict_row_shared(self):
+        query = Query("select * from apps.users where username = ?", "sayan")
+        await self.db.run_simple_query(query, row_factory=dict_row("username", "age"))
+        resp = await self.db.run_simple_query(query, row_factory=dict_row("username", "age"))
+        self.assertEqual(resp.row(), {"username": "sayan", "age": 25})
+        self.assertEqual(len(self.server.queries), 1)
+
+    async def test_lru(self):
+        await self.select("a")
+        await self.select("b")
+        await self.select("a")
+        await self.select("c")
+        # b was the least recently used
+        await self.select("a")
+        self.assertEqual(len(self.server.queries), 3)
+        await self.select("b")
+        self.assertEqual(len(self.server.queries), 4)
+
+    async def test_ttl(self):
+        self.db.set_result_cache(ResultCache(ttl=0.05))
+        await self.select()
+        await self.select()
+        await asyncio.sleep(0.1)
+        await self.select()
+        self.assertEqual(len(self.server.queries), 2)
+
+    async def test_errors_not_cached(self):
+        await self.select(model="apps.missing")
+        await self.select(model="apps.missing")
+        self.assertEqual(len(self.server.queries), 2)
+
+    async def test_write_invalidates_model(self):
+        await self.select(model="apps.users")
+        await self.select(model="apps.flags")
+        await self.db.run_simple_query(Query("update apps.users set age += ? where username = ?", UInt(1), "sayan"))
+        self.assertEqual(len(self.cache), 1)
+        await self.select(model="apps.flags")
+        await self.db.run_pipeline(Pipeline(Query("delete from apps.flags where username = ?", "sayan")))
+        self.assertEqual(len(self.cache), 0)
+        await self.select()
+        await self.db.execute_many("insert into apps.users(?, ?)", [("sophie", UInt(26))])
+        self.assertEqual(len(self.cache), 0)
+
+    async def test_write_invalidates_unqualified_model(self):
+        await self.db.run_simple_query(Query("use apps"))
+        await self.select(model="apps.users")
+        await self.select(model="apps.flags")
+        await self.db.run_simple_query(Query("insert into users(?, ?)", "sophie", UInt(26)))
+        self.assertEqual(len(self.cache), 1)
+        await self.select(model="users")
+        await self.db.run_simple_query(Query("update apps.users set age += ? where username = ?", UInt(1), "sayan"))
+        self.assertEqual(len(self.cache), 1)
+        # qualified names in different spaces are different models
+        await self.db.run_simple_query(Query("delete from logs.flags where username = ?", "sayan"))
+        self.assertEqual(len(self.cache), 1)
+        self.cache.invalidate_model("flags")
+        self.assertEqual(len(self.cache), 0)
+
+    async def test_other_statements_clear(self):
+        await self.select()
+        await self.db.run_simple_query(Query("use apps"))
+        self.assertEqual(len(self.cache), 0)
+
+    async def test_reports_keep_cache(self):
+        await self.select()
+        await self.db.run_simple_query(Query("sysctl report status"))
+        await self.db.run_simple_query(Query("inspect global"))
+        self.assertEqual(len(self.cache), 1)
+
+    async def test_pool_ping_bypasses_cache(self):
+        async with await self.server.config().create_pool(min_size=1, max_size=1, ping_after_idle=0,
+                                                          result_cache=self.cache) as pool:
+            async with pool.acquire() as db:
+                await db.run_simple_query(Query("select * from apps.users where username = ?", "sayan"))
+            misses = self.cache.misses
+            async with pool.acquire() as db:
+                await db.run_simple_query(Query("select * from apps.users where username = ?", "sayan"))
+            self.assertEqual(len(self.cache), 1)
+            self.assertEqual((self.cache.hits, self.cache.misses), (1, misses))
+            self.assertEqual(self.server.queries[-1], b"sysctl report status")
+
+    async def test_explicit_invalidation(self):
+        await self.select("a")
+        await self.select("b")
+        self.cache.invalidate(Query("select * from apps.users where username = ?", "a"))
+        self.assertEqual(len(self.cache), 1)
+        self.cache.invalidate_matching("apps.*")
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from array import array
+from src.skytable_py.columnar import Columns
+from src.skytable_py.exception import ClientException
+
+
+class ColumnsTest(unittest.TestCase):
+    def test_column_types(self):
+        columns = Columns()
+        columns._append_row([1, 1.5, "sayan", b"cakes", True, None])
+        columns._append_row([2, 2.5, "sophie", b"cookies", False, None])
+        self.assertEqual(columns.get_row_count(), 2)
+        self.assertEqual(columns.get_column_count(), 6)
+        self.assertEqual(columns.column(0), array("q", [1, 2]))
+        self.assertEqual(columns.column(1), array("d", [1.5, 2.5]))
+        self.assertEqual(columns.column(2), ["sayan", "sophie"])
+        self.assertEqual(columns.column(3), [b"cakes", b"cookies"])
+        self.assertEqual(columns.column(4), [True, False])
+        self.assertEqual(columns.column(5), [None, None])
+
+    def test_numeric_fallback(self):
+        columns = Columns()
+        columns._append_row([1, 1, 1.5])
+        columns._append_row([None, 2 ** 64 - 1, None])
+        self.assertEqual(columns.column(0), [1, None])
+        self.assertEqual(columns.column(1), [1, 2 ** 64 - 1])
+        self.assertEqual(columns.column(2), [1.5, None])
+
+    def test_to_numpy(self):
+        columns = Columns()
+        columns._append_row([1, "sayan"])
+        try:
+            import numpy
+        except ImportError:
+            with self.assertRaises(ClientException):
+                columns.to_numpy()
+        else:
+            ints, strings = columns.to_numpy()
+            self.assertEqual(ints.dtype, numpy.int64)
+            self.assertEqual(list(strings), ["sayan"])
+
+
+if __name__ == '__main__':
+    unittest.main()
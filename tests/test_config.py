@@ -15,6 +15,7 @@
 
 import unittest
 from src.skytable_py import Config
+from src.skytable_py.exception import ClientException
 
 
 class TestConfig(unittest.TestCase):
@@ -33,6 +34,15 @@ class TestConfig(unittest.TestCase):
     def test_port(self):
         self.assertEqual(self.c.get_port(), 2003)
 
+    def test_endpoints(self):
+        self.assertEqual(self.c.get_endpoints(), [("127.0.0.1", 2003)])
+        c = Config("root", "password", endpoints=[("10.0.0.1", 2003), ("10.0.0.2", 2004)])
+        self.assertEqual(c.get_host(), "10.0.0.1")
+        self.assertEqual(c.get_port(), 2003)
+        self.assertEqual(c.get_endpoints(), [("10.0.0.1", 2003), ("10.0.0.2", 2004)])
+        with self.assertRaises(ClientException):
+            Config("root", "password", endpoints=[])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,280 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from array import array
+from src.skytable_py.connection import Connection
+from src.skytable_py.exception import ClientException
+from src.skytable_py.query import Query, Pipeline
+from src.skytable_py.response import Value, Row
+from src.skytable_py.rows import tuple_row, dict_row
+
+
+class MockWriter:
+    def __init__(self) -> None:
+        self.written = bytearray()
+        self.writes = 0
+        self.drains = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        self.written += data
+        self.writes += 1
+
+    def writelines(self, data) -> None:
+        self.write(b"".join(data))
+
+    async def drain(self) -> None:
+        self.drains += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def wait_closed(self) -> None:
+        pass
+
+
+class MockReader(asyncio.StreamReader):
+    def __init__(self, data: bytes, chunk_size: int = -1) -> None:
+        super().__init__()
+        self.reads = []
+        self.chunk_size = chunk_size
+        self.feed_data(data)
+        self.feed_eof()
+
+    async def read(self, n: int = -1) -> bytes:
+        self.reads.append(n)
+        if self.chunk_size != -1:
+            n = min(n, self.chunk_size)
+        return await super().read(n)
+
+
+def mock_connection(response: bytes, chunk_size: int = -1) -> Connection:
+    return Connection(MockReader(response, chunk_size), MockWriter())
+
+
+class ConnectionTest(unittest.IsolatedAsyncioTestCase):
+    async def test_simple_query(self):
+        con = mock_connection(b"\x0D5\nsayan")
+        resp = await con.run_simple_query(Query("select username from apps.auth where id = ?", "1"))
+        self.assertEqual(resp.value(), Value("sayan"))
+        self.assertEqual(
+            bytes(con._writer.written), b"S50\n43\nselect username from apps.auth where id = ?\x061\n1")
+
+    async def test_prepared_query(self):
+        con = mock_connection(b"\x0D5\nsayan")
+        template = Query.template("select username from apps.auth where id = ?")
+        resp = await con.run_simple_query(template.bind("1"))
+        self.assertEqual(resp.value(), Value("sayan"))
+        self.assertEqual(
+            bytes(con._writer.written), b"S50\n43\nselect username from apps.auth where id = ?\x061\n1")
+
+    async def test_single_write(self):
+        con = mock_connection(b"\x12")
+        await con.run_simple_query(Query("insert into apps.auth(?, ?)", "sayan", "password"))
+        self.assertEqual(con._writer.writes, 1)
+        self.assertEqual(con._writer.drains, 1)
+
+    async def test_small_response_single_read(self):
+        con = mock_connection(b"\x0D5\nsayan")
+        await con.run_simple_query(Query("select username from apps.auth"))
+        self.assertEqual(len(con._reader.reads), 1)
+
+    async def test_large_response_read_size(self):
+        blob = b"x" * 1_000_000
+        con = mock_connection(b"\x0C1000000\n" + blob)
+        resp = await con.run_simple_query(Query("select data from apps.blobs"))
+        self.assertEqual(resp.value(), Value(blob))
+        # after the first read, the declared length is used to size the next read
+        self.assertEqual(len(con._reader.reads), 2)
+        self.assertGreaterEqual(con._reader.reads[1], 1_000_000 - con._reader.reads[0])
+
+    async def test_read_blob_into(self):
+        blob = b"x" * 1_000_000
+        con = mock_connection(b"\x0C1000000\n" + blob + b"\x0D5\nsayan", chunk_size=65536)
+        sink = bytearray(1_000_000)
+        self.assertEqual(await con.read_blob_into(Query("select data from apps.blobs"), sink), 1_000_000)
+        self.assertEqual(sink, blob)
+        resp = await con.run_simple_query(Query("select username from apps.auth"))
+        self.assertEqual(resp.value(), Value("sayan"))
+
+    async def test_read_blob_into_errors(self):
+        con = mock_connection(b"\x10\x05\x00\x0525\n\x0C5\nsayan")
+        sink = bytearray(4)
+        with self.assertRaisesRegex(ClientException, "error code"):
+            await con.read_blob_into(Query("select data from apps.blobs"), sink)
+        with self.assertRaisesRegex(ClientException, "binary or string"):
+            await con.read_blob_into(Query("select age from apps.users"), sink)
+        with self.assertRaisesRegex(ClientException, "doesn't fit"):
+            await con.read_blob_into(Query("select data from apps.blobs"), sink)
+
+    async def test_connection_closed(self):
+        con = mock_connection(b"\x0D5\nsay")
+        with self.assertRaises(ConnectionResetError):
+            await con.run_simple_query(Query("select username from apps.auth"))
+
+    async def test_pipeline(self):
+        con = mock_connection(b"\x12\x10\x05\x00\x111\n\x0D5\nsayan")
+        pipeline = Pipeline(
+            Query("insert into apps.auth(?)", "sayan"),
+            Query("insert into apps.auth(?)", "sayan"),
+            Query("select * from apps.auth where username = ?", "sayan"),
+        )
+        empty, error, row = await con.run_pipeline(pipeline)
+        self.assertTrue(empty.is_empty())
+        self.assertEqual(error.error(), 5)
+        self.assertEqual(row.row(), Row([Value("sayan")]))
+        self.assertEqual(bytes(con._writer.written), b"P" + str(len(pipeline._buffer)).encode() + b"\n" + pipeline._buffer)
+        self.assertEqual(con._writer.drains, 1)
+
+    async def test_pipeline_from_queries(self):
+        con = mock_connection(b"\x12\x12")
+        responses = await con.run_pipeline([Query("use $current"), Query("use $current")])
+        self.assertEqual(len(responses), 2)
+        self.assertTrue(all(resp.is_empty() for resp in responses))
+
+    async def test_execute_many(self):
+        failing = {4, 7}
+        con = mock_connection(b"".join(b"\x10\x05\x00" if i in failing else b"\x12" for i in range(10)))
+        params = ((f"user{i}", f"password{i}") for i in range(10))
+        summary = await con.execute_many("insert into apps.auth(?, ?)", params, batch_size=3,
+                                         max_batches_in_flight=2)
+        self.assertEqual(summary.executed, 10)
+        self.assertEqual(summary.succeeded(), 8)
+        self.assertEqual(summary.errors, [(4, 5), (7, 5)])
+        self.assertFalse(summary.is_ok())
+        # 3 + 3 + 3 + 1
+        self.assertEqual(con._writer.writes, 4)
+        self.assertEqual(con._writer.written.count(b"insert into apps.auth(?, ?)"), 10)
+
+    async def test_execute_many_bad_parameter(self):
+        # two batches of three are sent before the parameter in the third batch fails to encode
+        con = mock_connection(b"\x12" * 6 + b"\x0D5\nsayan")
+        params = [(f"user{i}",) for i in range(7)] + [(object(),)]
+        with self.assertRaises(ClientException):
+            await con.execute_many("insert into apps.auth(?)", params, batch_size=3, max_batches_in_flight=2)
+        resp = await con.run_simple_query(Query("select username from apps.auth where id = ?", "1"))
+        self.assertEqual(resp.value(), Value("sayan"))
+
+    async def test_execute_many_failing_params(self):
+        def params():
+            for i in range(5):
+                yield (f"user{i}",)
+            raise ValueError("source failed")
+
+        con = mock_connection(b"\x12" * 4 + b"\x0D5\nsayan")
+        with self.assertRaises(ValueError):
+            await con.execute_many("insert into apps.auth(?)", params(), batch_size=2)
+        resp = await con.run_simple_query(Query("select username from apps.auth where id = ?", "1"))
+        self.assertEqual(resp.value(), Value("sayan"))
+
+    async def test_execute_many_cancelled(self):
+        # the responses never arrive
+        con = Connection(asyncio.StreamReader(), MockWriter())
+        task = asyncio.ensure_future(con.execute_many("insert into apps.auth(?)", [("sayan",)]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertTrue(con._writer.closed)
+
+    async def test_execute_many_empty(self):
+        con = mock_connection(b"")
+        summary = await con.execute_many(Query.template("insert into apps.auth(?, ?)"), [])
+        self.assertEqual(summary.executed, 0)
+        self.assertTrue(summary.is_ok())
+        self.assertEqual(con._writer.writes, 0)
+
+    async def test_stream_rows(self):
+        rows = b"".join(b"1\n\x0D%d\nuser%d" % (len(str(i)) + 4, i) for i in range(1000))
+        con = mock_connection(b"\x131000\n" + rows, chunk_size=4096)
+        streamed = []
+        async for row in con.stream_rows(Query("select all * from apps.auth limit ?", "1000")):
+            # rows are handed out instead of being collected into the multi-row
+            self.assertEqual(con._protocol._stack[0].items if con._protocol._stack else [], [])
+            streamed.append(row)
+        self.assertEqual(streamed, [Row([Value(f"user{i}")]) for i in range(1000)])
+
+    async def test_stream_single_row(self):
+        con = mock_connection(b"\x111\n\x0D5\nsayan")
+        streamed = [row async for row in con.stream_rows(Query("select * from apps.auth where username = ?", "s"))]
+        self.assertEqual(streamed, [Row([Value("sayan")])])
+
+    async def test_stream_error(self):
+        con = mock_connection(b"\x10\x05\x00")
+        with self.assertRaises(ClientException):
+            async for _ in con.stream_rows(Query("select * from apps.auth where username = ?", "s")):
+                pass
+
+    async def test_stream_stopped_early(self):
+        rows = b"".join(b"1\n\x0D5\nuser%d" % i for i in range(10))
+        con = mock_connection(b"\x1310\n" + rows + b"\x0D5\nsayan", chunk_size=16)
+        stream = con.stream_rows(Query("select all * from apps.auth limit ?", "10"))
+        async for row in stream:
+            break
+        await stream.aclose()
+        # the rest of the multi-row was discarded, so the next response is read correctly
+        resp = await con.run_simple_query(Query("select username from apps.auth"))
+        self.assertEqual(resp.value(), Value("sayan"))
+
+    async def test_stream_abandoned(self):
+        errors = []
+        asyncio.get_event_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        rows = b"".join(b"1\n\x0D5\nuser%d" % i for i in range(10))
+        con = mock_connection(b"\x1310\n" + rows + b"\x0D5\nsayan" + b"\x1310\n" + rows + b"\x0D6\nsophie",
+                              chunk_size=16)
+        async for row in con.stream_rows(Query("select all * from apps.auth limit ?", "10")):
+            break
+        # the next query reads past the rest of the multi-row, whether or not the stream was finalized yet
+        resp = await con.run_simple_query(Query("select username from apps.auth"))
+        self.assertEqual(resp.value(), Value("sayan"))
+        stream = con.stream_rows(Query("select all * from apps.auth limit ?", "10"))
+        self.assertEqual(await stream.__anext__(), Row([Value("user0")]))
+        resp = await con.run_simple_query(Query("select username from apps.auth"))
+        self.assertEqual(resp.value(), Value("sophie"))
+        with self.assertRaises(ClientException):
+            await stream.__anext__()
+        await asyncio.sleep(0.01)
+        self.assertEqual(errors, [])
+
+    async def test_fetch_columns(self):
+        rows = b"".join(b"2\n\x0D%d\nuser%d\x05%d\n" % (len(str(i)) + 4, i, i) for i in range(100))
+        con = mock_connection(b"\x13100\n" + rows, chunk_size=64)
+        columns = await con.fetch_columns(Query("select all username, age from apps.users limit ?", "100"))
+        self.assertEqual(columns.get_row_count(), 100)
+        self.assertEqual(columns.column(0), [f"user{i}" for i in range(100)])
+        self.assertEqual(columns.column(1), array("q", range(100)))
+
+    async def test_fetch_columns_single_row(self):
+        con = mock_connection(b"\x112\n\x0D5\nsayan\x0525\n")
+        columns = await con.fetch_columns(Query("select username, age from apps.users where username = ?", "s"))
+        self.assertEqual(columns.column(0), ["sayan"])
+        self.assertEqual(columns.column(1), array("q", [25]))
+
+    async def test_row_factory(self):
+        con = mock_connection(b"\x112\n\x0D5\nsayan\x0525\n" * 2 + b"\x132\n1\n\x0D5\nsayan1\n\x0D6\nsophie", chunk_size=3)
+        con.set_row_factory(tuple_row)
+        query = Query("select username, age from apps.users where username = ?", "s")
+        self.assertEqual((await con.run_simple_query(query)).row(), ("sayan", 25))
+        resp = await con.run_simple_query(query, row_factory=dict_row("username", "age"))
+        self.assertEqual(resp.row(), {"username": "sayan", "age": 25})
+        # the connection's factory is used again afterwards
+        streamed = [row async for row in con.stream_rows(Query("select all username from apps.users limit ?", "2"))]
+        self.assertEqual(streamed, [("sayan",), ("sophie",)])
+
+
+if __name__ == '__main__':
+    unittest.main()
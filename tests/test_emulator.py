@@ -0,0 +1,84 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+from src.skytable_py import Query, Pipeline
+from src.skytable_py.emulator import Emulator, encode_value, encode_row, encode_rows, encode_error, scripted
+from src.skytable_py.loadgen import run
+from src.skytable_py.protocol import Protocol
+from src.skytable_py.response import Value, Row
+
+
+def decode(blob: bytes):
+    return Protocol(blob).parse()
+
+
+class EncodeTest(unittest.TestCase):
+    def test_encode_value(self):
+        for value in (None, True, False, 0, 255, -255, 3.05, 1e-05, 1e16, -0.5, b"", b"blob", "", "sophie"):
+            with self.subTest(value):
+                self.assertEqual(decode(encode_value(value)).value().data(), value)
+        self.assertEqual(decode(encode_value(255)).value().int(), 255)
+        self.assertEqual(decode(encode_value(1e16)).value().float(), 1e16)
+        self.assertEqual(encode_value(1.0), b"\x0B1\n")
+        self.assertEqual(encode_value(float("-inf")), b"\x0B-inf\n")
+        self.assertEqual([value.data() for value in decode(encode_value([1, "two", None])).value().list()],
+                         [1, "two", None])
+
+    def test_encode_responses(self):
+        self.assertEqual(decode(encode_row(["sayan", None])).row(), Row([Value("sayan"), Value(None)]))
+        self.assertEqual(decode(encode_rows([["sayan"], ["sophie"]])).rows(),
+                         [Row([Value("sayan")]), Row([Value("sophie")])])
+        self.assertEqual(decode(encode_error(5)).error(), 5)
+
+
+class EmulatorTest(unittest.IsolatedAsyncioTestCase):
+    async def test_fragmented_large_response(self):
+        rows = [[f"user{i}", i] for i in range(10_000)]
+        async with Emulator(lambda query: encode_rows(rows), chunk_size=1000) as server:
+            db = await server.config().connect()
+            resp = await db.run_simple_query(Query("select all * from apps.users limit ?", "10000"))
+            await db.close()
+        self.assertEqual(len(resp.rows()), 10_000)
+        self.assertEqual([value.data() for value in resp.rows()[-1].columns], ["user9999", 9999])
+
+    async def test_scripted_with_latency(self):
+        async with Emulator(scripted([encode_value("sayan"), encode_error(5)]), latency=0.05) as server:
+            db = await server.config().connect()
+            start = time.perf_counter()
+            first, second = await db.run_pipeline(Pipeline(Query("select"), Query("delete")))
+            # a pipeline is delayed once
+            self.assertLess(time.perf_counter() - start, 0.5)
+            self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+            await db.close()
+        self.assertEqual(first.value(), Value("sayan"))
+        self.assertEqual(second.error(), 5)
+        self.assertEqual(server.queries, [b"select", b"delete"])
+        self.assertEqual(server.handshakes, 1)
+
+    async def test_loadgen(self):
+        async with Emulator(lambda query: encode_row(["sayan"]), record_queries=False) as server:
+            report = await run(server.config(), Query("select"), workers=4, duration=None, requests=200)
+        self.assertEqual(report["requests"], 200)
+        self.assertEqual(report["errors"], 0)
+        self.assertEqual(server.handshakes, 4)
+        self.assertEqual(server.queries, [])
+        self.assertLessEqual(report["p50"], report["p99"])
+        self.assertLessEqual(report["p99"], report["p999"])
+
+
+if __name__ == '__main__':
+    unittest.main()
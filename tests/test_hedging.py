@@ -0,0 +1,71 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from src.skytable_py import Query
+from src.skytable_py.emulator import Emulator, EMPTY, encode_value
+
+
+def answer(name: str):
+    return lambda query: encode_value(name) if query.startswith(b"select") else EMPTY
+
+
+class HedgedPoolTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.slow = await Emulator(answer("slow"), latency=0.5).start()
+        self.fast = await Emulator(answer("fast")).start()
+
+    async def asyncTearDown(self):
+        await self.slow.stop()
+        await self.fast.stop()
+
+    async def test_hedged_read(self):
+        async with await self.slow.config().create_hedged_pool([self.fast.config()], delay=0.02) as hedged:
+            slow_pool, _ = hedged.get_pools()
+            resp = await hedged.run_simple_query(Query("select * from apps.users where username = ?", "sayan"))
+            self.assertEqual(resp.value().string(), "fast")
+            self.assertEqual(hedged.hedged, 1)
+            # the slow query was cancelled, so its connection was closed
+            self.assertEqual(slow_pool.get_size(), 0)
+            self.assertEqual(len(self.slow.queries), 1)
+            # the next read goes to the fast instance first and isn't hedged
+            resp = await hedged.run_simple_query(Query("select * from apps.users where username = ?", "sayan"))
+            self.assertEqual(resp.value().string(), "fast")
+            self.assertEqual(hedged.hedged, 1)
+
+    async def test_writes_not_hedged(self):
+        async with await self.fast.config().create_hedged_pool([self.slow.config()], delay=0.02) as hedged:
+            for _ in range(2):
+                resp = await hedged.run_simple_query(Query("insert into apps.users(?)", "sayan"))
+                self.assertTrue(resp.is_empty())
+            self.assertEqual(len(self.fast.queries), 2)
+            self.assertEqual(self.slow.queries, [])
+
+    async def test_learned_delay(self):
+        other = await Emulator(answer("other")).start()
+        try:
+            async with await self.fast.config().create_hedged_pool([other.config()], delay=10.0, percentile=0.99,
+                                                                   min_samples=5) as hedged:
+                self.assertEqual(hedged.get_delay(), 10.0)
+                for _ in range(5):
+                    await hedged.run_simple_query(Query("select * from apps.users"))
+                self.assertLess(hedged.get_delay(), 0.5)
+                self.assertEqual(hedged.hedged, 0)
+        finally:
+            await other.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
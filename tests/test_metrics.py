@@ -0,0 +1,114 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from src.skytable_py import Metrics, Query, Pipeline
+from src.skytable_py.emulator import Emulator, encode_value
+from src.skytable_py.metrics import Histogram
+from tests.test_connection import mock_connection
+
+
+class HistogramTest(unittest.TestCase):
+    def test_percentile(self):
+        histogram = Histogram([1, 2, 4, 8])
+        for value in (0.5, 1, 3, 3, 100):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 0, 2, 0, 1])
+        self.assertEqual(histogram.percentile(0.4), 1)
+        self.assertEqual(histogram.percentile(0.5), 4)
+        self.assertEqual(histogram.percentile(0.99), 100)
+        self.assertEqual(histogram.mean(), 107.5 / 5)
+        self.assertEqual(Histogram([1]).percentile(0.5), 0.0)
+
+
+class MetricsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_simple_query(self):
+        response = b"\x0D" + b"%d\n" % 10_000 + b"x" * 10_000
+        con = mock_connection(response, chunk_size=4096)
+        metrics = Metrics()
+        samples = []
+        metrics.add_listener(samples.append)
+        con.set_metrics(metrics)
+        resp = await con.run_simple_query(Query("select"))
+        self.assertEqual(resp.value().string(), "x" * 10_000)
+        (sample,) = samples
+        self.assertEqual(sample.queries, 1)
+        self.assertEqual(sample.bytes_written, len(con._writer.written))
+        self.assertEqual(sample.bytes_read, len(response))
+        self.assertEqual(sample.reads, len(con._reader.reads))
+        self.assertEqual(sample.parse_attempts, sample.reads + 1)
+        self.assertGreater(sample.total_time(), 0)
+        self.assertEqual(metrics.queries, 1)
+        self.assertEqual(metrics.bytes_read, len(response))
+        self.assertEqual(metrics.wait_time.count, 1)
+        self.assertEqual(metrics.summary()["queries"], 1)
+
+    async def test_pipeline(self):
+        con = mock_connection(b"\x12\x12\x12")
+        metrics = Metrics()
+        con.set_metrics(metrics)
+        resps = await con.run_pipeline(Pipeline(Query("a"), Query("b"), Query("c")))
+        self.assertTrue(all(resp.is_empty() for resp in resps))
+        self.assertEqual(metrics.queries, 3)
+        self.assertEqual(metrics.bytes_read, 3)
+        self.assertEqual(metrics.reads_per_response.count, 3)
+        self.assertEqual(metrics.total_time.count, 1)
+
+    async def test_bulk_and_streaming(self):
+        rows = b"\x132\n1\n\x0D5\nsayan1\n\x0D6\nsophie"
+        response = b"\x12" * 3 + rows + rows + b"\x0C3\nabc"
+        con = mock_connection(response, chunk_size=4)
+        metrics = Metrics()
+        samples = []
+        metrics.add_listener(samples.append)
+        con.set_metrics(metrics)
+        summary = await con.execute_many("insert into apps.auth(?)", [("a",), ("b",), ("c",)], batch_size=2)
+        self.assertEqual(summary.succeeded(), 3)
+        self.assertEqual([sample.queries for sample in samples], [2, 1])
+        self.assertEqual([row async for row in con.stream_rows(Query("select all"))][1].columns[0].string(), "sophie")
+        self.assertEqual((await con.fetch_columns(Query("select all"))).get_row_count(), 2)
+        await con.read_blob_into(Query("select"), bytearray(3))
+        self.assertEqual(metrics.queries, 6)
+        self.assertEqual(metrics.bytes_read, len(response))
+        self.assertEqual(metrics.bytes_written, len(con._writer.written))
+        self.assertGreater(samples[2].reads, 1)
+
+    async def test_multiplexed(self):
+        metrics = Metrics()
+        async with Emulator(lambda query: encode_value("sayan"), latency=0.01) as server:
+            db = await server.config().connect_multiplexed()
+            db.set_metrics(metrics)
+            await asyncio.gather(db.run_simple_query(Query("select")), db.run_pipeline([Query("a"), Query("b")]))
+            await db.close()
+        self.assertEqual(metrics.queries, 3)
+        self.assertEqual(metrics.total_time.count, 2)
+        self.assertEqual(metrics.bytes_read, 3 * len(encode_value("sayan")))
+        self.assertGreater(metrics.wait_time.max, 0.01)
+
+    async def test_pool(self):
+        metrics = Metrics()
+        async with Emulator(lambda query: encode_value("sayan")) as server:
+            async with await server.config().create_pool(min_size=2, max_size=2, ping_after_idle=None,
+                                                         metrics=metrics) as pool:
+                self.assertIs(pool.get_metrics(), metrics)
+                for _ in range(2):
+                    async with pool.acquire() as db:
+                        await db.run_simple_query(Query("select"))
+        self.assertEqual(metrics.queries, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
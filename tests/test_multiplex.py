@@ -0,0 +1,79 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from src.skytable_py import Config, Query, Pipeline
+from src.skytable_py.exception import ClientException
+from src.skytable_py.emulator import Emulator
+
+
+def echo(query: bytes) -> bytes:
+    # answer with the single string parameter of the query
+    param = query.split(b"\x06", 1)[1].split(b"\n", 1)[1]
+    return b"\x0D" + str(len(param)).encode() + b"\n" + param
+
+
+class MultiplexTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await Emulator(echo).start()
+        self.db = await Config("root", "password", port=self.server.port).connect_multiplexed()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        await self.server.stop()
+
+    async def test_concurrent_queries(self):
+        async def query(i: int) -> str:
+            resp = await self.db.run_simple_query(Query("select * from apps.auth where username = ?", f"user{i}"))
+            return resp.value().string()
+
+        results = await asyncio.gather(*(query(i) for i in range(500)))
+        self.assertEqual(results, [f"user{i}" for i in range(500)])
+        self.assertEqual(self.server.handshakes, 1)
+        self.assertEqual(self.db.get_pending_count(), 0)
+
+    async def test_concurrent_pipelines(self):
+        async def pipeline(i: int):
+            responses = await self.db.run_pipeline(Pipeline(
+                *(Query("select * from apps.auth where username = ?", f"user{i}.{j}") for j in range(10))
+            ))
+            return [resp.value().string() for resp in responses]
+
+        results = await asyncio.gather(*(pipeline(i) for i in range(20)))
+        self.assertEqual(results, [[f"user{i}.{j}" for j in range(10)] for i in range(20)])
+
+    async def test_cancelled_query(self):
+        task = asyncio.ensure_future(self.db.run_simple_query(Query("select ?", "cancelled")))
+        await asyncio.sleep(0)
+        task.cancel()
+        resp = await self.db.run_simple_query(Query("select ?", "next"))
+        # the response for the cancelled query is discarded rather than handed to the next one
+        self.assertEqual(resp.value().string(), "next")
+
+    async def test_server_closed(self):
+        await self.server.stop()
+        with self.assertRaises((ConnectionError, ClientException)):
+            await self.db.run_simple_query(Query("select ?", "closed"))
+        self.assertTrue(self.db.is_closed())
+
+    async def test_closed(self):
+        await self.db.close()
+        with self.assertRaises(ClientException):
+            await self.db.run_simple_query(Query("select ?", "closed"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from src.skytable_py import Config, Query
+from src.skytable_py.exception import ClientException
+from src.skytable_py.emulator import Emulator
+
+
+class PoolTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await Emulator().start()
+        self.config = Config("root", "password", port=self.server.port)
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def test_warm_up(self):
+        async with await self.config.create_pool(min_size=3, max_size=5) as pool:
+            self.assertEqual(pool.get_size(), 3)
+            self.assertEqual(pool.get_idle_count(), 3)
+            self.assertEqual(self.server.handshakes, 3)
+
+    async def test_reuse(self):
+        async with await self.config.create_pool(min_size=1, max_size=5) as pool:
+            for _ in range(5):
+                async with pool.acquire() as db:
+                    self.assertTrue((await db.run_simple_query(Query("use $current"))).is_empty())
+            self.assertEqual(self.server.handshakes, 1)
+            self.assertEqual(pool.get_size(), 1)
+
+    async def test_max_size(self):
+        async with await self.config.create_pool(min_size=0, max_size=2) as pool:
+            async with pool.acquire(), pool.acquire():
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(pool.acquire().__aenter__(), 0.05)
+            self.assertEqual(pool.get_size(), 2)
+
+    async def test_discard_on_error(self):
+        async with await self.config.create_pool(min_size=1, max_size=2) as pool:
+            with self.assertRaises(RuntimeError):
+                async with pool.acquire():
+                    raise RuntimeError("failed")
+            self.assertEqual(pool.get_size(), 0)
+            async with pool.acquire():
+                pass
+            self.assertEqual(self.server.handshakes, 2)
+
+    async def test_max_lifetime(self):
+        async with await self.config.create_pool(min_size=1, max_size=2, max_lifetime=0.01) as pool:
+            await asyncio.sleep(0.05)
+            async with pool.acquire():
+                pass
+            # the expired connection is replaced, in the background or on acquire
+            self.assertGreaterEqual(self.server.handshakes, 2)
+
+    async def test_idle_eviction(self):
+        async with await self.config.create_pool(min_size=1, max_size=5, max_idle_time=0.02) as pool:
+            async with pool.acquire(), pool.acquire(), pool.acquire():
+                pass
+            self.assertEqual(pool.get_idle_count(), 3)
+            await asyncio.sleep(0.1)
+            self.assertEqual(pool.get_size(), 1)
+
+    async def test_ping_after_idle(self):
+        async with await self.config.create_pool(min_size=1, max_size=1, ping_after_idle=0) as pool:
+            async with pool.acquire():
+                pass
+            self.assertEqual(self.server.queries, [b"sysctl report status"])
+
+    async def test_invalid_size(self):
+        with self.assertRaises(ClientException):
+            await self.config.create_pool(min_size=5, max_size=2)
+
+    async def test_closed(self):
+        pool = await self.config.create_pool()
+        await pool.close()
+        with self.assertRaises(ClientException):
+            async with pool.acquire():
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
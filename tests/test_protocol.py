@@ -15,8 +15,12 @@
 
 # NOTE: All these are just mock values and don't make any sense and often don't use correct integer boundaries
 
+import io
+import math
 import unittest
+from src.skytable_py.exception import ProtocolException
 from src.skytable_py.protocol import Protocol
+from src.skytable_py.rows import tuple_row, namedtuple_row
 from src.skytable_py.response import Value, UInt8, UInt16, UInt32, UInt64, SInt8, SInt16, SInt32, SInt64, Float32, \
     Float64, ErrorCode, Row, Empty
 
@@ -57,6 +61,38 @@ class ProtocolTest(unittest.TestCase):
         self.assertEqual(
             Protocol(b"\x0B3.141592654\n").parse_next_element(), Value(Float64(3.141592654)))
 
+    def test_float_fraction_leading_zeros(self):
+        self.assertEqual(Protocol(b"\x0B3.05\n").parse_next_element().float(), 3.05)
+        self.assertEqual(Protocol(b"\x0B-0.001\n").parse_next_element().float(), -0.001)
+
+    def test_float_server_format(self):
+        # floats are formatted with Rust's `Display`
+        for blob, expected in ((b"\x0B1\n", 1.0), (b"\x0B-3\n", -3.0), (b"\x0Binf\n", float("inf")),
+                               (b"\x0B-inf\n", float("-inf"))):
+            self.assertEqual(Protocol(blob).parse_next_element().float(), expected)
+            self.assertEqual(Protocol(blob, lazy=True).parse_next_element().float(), expected)
+        self.assertTrue(math.isnan(Protocol(b"\x0BNaN\n").parse_next_element().float()))
+
+    def test_invalid_numbers(self):
+        for blob in (b"\x0512a\n", b"\x05\n", b"\x05+1\n", b"\x05 1\n", b"\x051_0\n", b"\x05-1\n", b"\x09-\n",
+                     b"\x09--1\n", b"\x09+1\n", b"\x0B\n", b"\x0B1.5a\n", b"\x0B+1.5\n", b"\x0B1_0.5\n",
+                     b"\x0B-1.5 \n"):
+            with self.assertRaises(ProtocolException, msg=blob):
+                Protocol(blob).parse_next_element()
+            # lazy values are validated the same way once they are accessed
+            value = Protocol(blob, lazy=True).parse_next_element()
+            with self.assertRaises(ProtocolException, msg=blob):
+                value.data()
+
+    def test_partial_numbers(self):
+        for blob, expected in ((b"\x05123\n", 123), (b"\x09-123\n", -123), (b"\x0B-12.05\n", -12.05)):
+            protocol = Protocol()
+            for byte in blob[:-1]:
+                protocol.push_additional_bytes(bytes([byte]))
+                self.assertIsNone(protocol.parse())
+            protocol.push_additional_bytes(blob[-1:])
+            self.assertEqual(protocol.parse().value().data(), expected)
+
     def test_binary(self):
         self.assertEqual(
             Protocol(b"\x0C6\nbinary").parse_next_element(), Value(b"binary"))
@@ -101,3 +137,249 @@ class ProtocolTest(unittest.TestCase):
                 Row([Value("sayan")])
             ]
         )
+
+    def test_error_code_with_trailing_data(self):
+        self.assertEqual(
+            Protocol(b"\x10\x01\x00\x00").parse_next_element(), ErrorCode(1))
+
+    def test_compact_after_response(self):
+        protocol = Protocol(b"\x0D5\nsayan\x0D6\nsophie")
+        self.assertEqual(protocol.parse().value(), Value("sayan"))
+        self.assertEqual(bytes(protocol._buffer[:protocol._end]), b"\x0D6\nsophie")
+        self.assertEqual(protocol._cursor, 0)
+        self.assertEqual(protocol.parse().value(), Value("sophie"))
+        self.assertEqual(protocol._end, 0)
+
+    def test_chunked_response(self):
+        blob = b"\x132\n5\n\x00\x01\x01\x02255\n\x06-255\n\x0A3.141592654\n1\n\x0D5\nsayan"
+        protocol = Protocol()
+        for i in range(len(blob) - 1):
+            protocol.push_additional_bytes(blob[i:i + 1])
+            self.assertIsNone(protocol.parse())
+        protocol.push_additional_bytes(blob[-1:])
+        self.assertEqual(protocol.parse().rows(), [
+            Row([Value(None), Value(True), Value(UInt8(255)),
+                 Value(SInt8(-255)), Value(Float32(3.141592654))]),
+            Row([Value("sayan")])
+        ])
+        self.assertEqual(protocol._end, 0)
+
+    def test_zero_and_empty_scalars(self):
+        self.assertEqual(
+            Protocol(b"\x020\n").parse_next_element(), Value(UInt8(0)))
+        self.assertEqual(
+            Protocol(b"\x060\n").parse_next_element(), Value(SInt8(0)))
+        self.assertEqual(
+            Protocol(b"\x0D0\n").parse_next_element(), Value(""))
+        self.assertEqual(
+            Protocol(b"\x0C0\n").parse_next_element(), Value(b""))
+
+    def test_empty_rows_response(self):
+        self.assertEqual(Protocol(b"\x130\n").parse().rows(), [])
+
+    def test_resume_partial_rows(self):
+        protocol = Protocol(b"\x133\n1\n\x0D5\nsayan1\n\x0D6\nsop")
+        self.assertIsNone(protocol.parse())
+        # the first row and the second row's header are kept
+        rows, row = protocol._stack
+        self.assertEqual(rows.items, [Row([Value("sayan")])])
+        self.assertEqual(row.items, [])
+        protocol.push_additional_bytes(b"hie1\n\x0D4\n")
+        self.assertIsNone(protocol.parse())
+        self.assertEqual(len(protocol._stack[0].items), 2)
+        protocol.push_additional_bytes(b"jane")
+        self.assertEqual(protocol.parse().rows(), [
+            Row([Value("sayan")]), Row([Value("sophie")]), Row([Value("jane")])
+        ])
+        self.assertEqual(protocol._stack, [])
+
+    def test_resume_nested_list(self):
+        blob = b"\x0E2\n\x0E2\n\x0D1\na\x0D1\nb\x0E1\n\x0D1\nc"
+        protocol = Protocol()
+        for byte in blob[:-1]:
+            protocol.push_additional_bytes(bytes([byte]))
+            self.assertIsNone(protocol.parse())
+        protocol.push_additional_bytes(blob[-1:])
+        self.assertEqual(protocol.parse().value(), Value(
+            [Value([Value("a"), Value("b")]), Value([Value("c")])]))
+
+    def test_get_buffer(self):
+        protocol = Protocol()
+        with protocol.get_buffer(10) as view:
+            self.assertGreaterEqual(len(view), 10)
+            view[:8] = b"\x0D5\nsayan"
+        protocol.buffer_updated(8)
+        self.assertEqual(protocol.parse().value(), Value("sayan"))
+        # the same buffer is reused once the response has been consumed
+        buffer = protocol._buffer
+        protocol.push_additional_bytes(b"\x0D6\nsophie")
+        self.assertIs(protocol._buffer, buffer)
+        self.assertEqual(protocol.parse().value(), Value("sophie"))
+
+    def test_buffer_grows(self):
+        protocol = Protocol()
+        blob = b"x" * 100_000
+        protocol.push_additional_bytes(b"\x0C100000\n" + blob[:50_000])
+        self.assertIsNone(protocol.parse())
+        protocol.push_additional_bytes(blob[50_000:])
+        self.assertEqual(protocol.parse().value(), Value(blob))
+
+    def test_large_blob_bypasses_buffer(self):
+        protocol = Protocol()
+        blob = bytes(range(256)) * 1000
+        data = b"\x0C256000\n" + blob + b"\x0D5\nsayan"
+        protocol.push_additional_bytes(data[:4000])
+        self.assertIsNone(protocol.parse())
+        self.assertEqual(protocol.bytes_needed(), 256_000 - (4000 - len(b"\x0C256000\n")))
+        for i in range(4000, len(data), 4000):
+            protocol.push_additional_bytes(data[i:i + 4000])
+        # the blob was written into its own buffer, so the receive buffer kept its size
+        self.assertEqual(len(protocol._buffer), 4096)
+        self.assertEqual(protocol.parse().value(), Value(blob))
+        self.assertEqual(protocol.parse().value(), Value("sayan"))
+
+    def test_large_string_in_row(self):
+        text = "ü" * 50_000
+        encoded = text.encode()
+        data = b"\x112\n\x0D%d\n" % len(encoded) + encoded + b"\x0525\n"
+        for factory, expected in ((None, Row([Value(text), Value(UInt8(25))])), (tuple_row, (text, 25))):
+            protocol = Protocol()
+            protocol._row_factory = factory
+            for i in range(0, len(data), 3000):
+                protocol.push_additional_bytes(data[i:i + 3000])
+                resp = protocol.parse()
+            self.assertEqual(resp.row(), expected)
+
+    def test_large_blob_lazy(self):
+        blob = b"x" * 100_000
+        protocol = Protocol(lazy=True)
+        protocol.push_additional_bytes(b"\x111\n\x0C100000\n" + blob[:1000])
+        self.assertIsNone(protocol.parse())
+        protocol.push_additional_bytes(blob[1000:])
+        self.assertEqual(protocol.parse().row(), Row([Value(blob)]))
+
+    def test_blob_sink(self):
+        data = b"\x112\n\x0C3\nabc\x0D100000\n" + b"x" * 100_000
+        sink = bytearray(100_003)
+        protocol = Protocol()
+        protocol._begin_blob_sink(sink)
+        for i in range(0, len(data), 5000):
+            protocol.push_additional_bytes(data[i:i + 5000])
+            resp = protocol.parse()
+        self.assertIsNotNone(resp)
+        self.assertEqual(protocol._end_blob_sink(), (100_003, 2, False))
+        self.assertEqual(bytes(sink), b"abc" + b"x" * 100_000)
+
+    def test_blob_sink_file(self):
+        blob = bytes(range(256)) * 1000
+        sink = io.BytesIO()
+        protocol = Protocol()
+        protocol._begin_blob_sink(sink)
+        protocol.push_additional_bytes(b"\x0C256000\n" + blob[:100])
+        self.assertIsNone(protocol.parse())
+        protocol.push_additional_bytes(blob[100:])
+        self.assertIsNotNone(protocol.parse())
+        self.assertEqual(protocol._end_blob_sink(), (256_000, 1, False))
+        self.assertEqual(sink.getvalue(), blob)
+
+    def test_blob_sink_overflow(self):
+        sink = bytearray(4)
+        protocol = Protocol(b"\x0C5\nsayan\x0D6\nsophie")
+        protocol._begin_blob_sink(sink)
+        self.assertIsNotNone(protocol.parse())
+        self.assertEqual(protocol._end_blob_sink(), (5, 1, True))
+        # decoding carries on normally afterwards
+        self.assertEqual(protocol.parse().value(), Value("sophie"))
+
+    def test_bytes_needed(self):
+        protocol = Protocol(b"\x0C100\n" + b"x" * 40)
+        self.assertIsNone(protocol.parse())
+        self.assertEqual(protocol.bytes_needed(), 60)
+        protocol.push_additional_bytes(b"x" * 50)
+        self.assertEqual(protocol.bytes_needed(), 10)
+        self.assertIsNone(protocol.parse())
+        protocol.push_additional_bytes(b"x" * 10)
+        self.assertEqual(protocol.bytes_needed(), 0)
+        self.assertEqual(protocol.parse().value(), Value(b"x" * 100))
+
+    def test_bytes_needed_rows(self):
+        # two rows of 10 bytes each have been decoded, so 8 more rows should need about 80 bytes
+        row = b"1\n\x0D5\nsayan"
+        protocol = Protocol(b"\x1310\n" + row + row)
+        self.assertIsNone(protocol.parse())
+        self.assertEqual(protocol.bytes_needed(), 80)
+
+    def test_native_row_stream(self):
+        protocol = Protocol(b"\x132\n3\n\x0D5\nsayan\x0E1\n\x02255\n\x00" + b"3\n\x0D6\nsophie\x0E0\n\x01\x01")
+        protocol._begin_row_stream(native=True)
+        self.assertEqual(protocol.parse().rows(), [])
+        self.assertEqual(protocol._take_streamed_rows(), [["sayan", [255], None], ["sophie", [], True]])
+        protocol._end_row_stream()
+
+    def test_row_factory(self):
+        protocol = Protocol(b"\x132\n3\n\x0D5\nsayan\x0E1\n\x02255\n\x00" + b"3\n\x0D6\nsophie\x0E0\n\x01\x01")
+        protocol._row_factory = tuple_row
+        resp = protocol.parse()
+        self.assertEqual(resp.rows(), [("sayan", [255], None), ("sophie", [], True)])
+        self.assertIsNone(resp.row())
+        # a factory may return lists too, without being mistaken for a multi-row
+        protocol.push_additional_bytes(b"\x112\n\x0D5\nsayan\x0B3.5\n")
+        resp = protocol.parse(row_factory=list)
+        self.assertEqual(resp.row(), ["sayan", 3.5])
+        self.assertIsNone(resp.rows())
+        self.assertIs(protocol._row_factory, tuple_row)
+        # other elements are unaffected
+        protocol.push_additional_bytes(b"\x0E1\n\x0D5\nsayan")
+        self.assertEqual(protocol.parse().value(), Value([Value("sayan")]))
+
+    def test_row_factory_incomplete(self):
+        user = namedtuple_row("username", "age", typename="User")
+        blob = b"\x132\n2\n\x0D5\nsayan\x0525\n2\n\x0D6\nsophie\x0526\n"
+        protocol = Protocol()
+        for i in range(len(blob)):
+            protocol.push_additional_bytes(blob[i:i + 1])
+            resp = protocol.parse(row_factory=user)
+            if i < len(blob) - 1:
+                self.assertIsNone(resp)
+        self.assertEqual([row.username for row in resp.rows()], ["sayan", "sophie"])
+        self.assertEqual(resp.rows()[1].age, 26)
+
+    def test_reset(self):
+        protocol = Protocol(lazy=True)
+        protocol._row_factory = tuple_row
+        protocol.push_additional_bytes(b"\x132\n1\n\x0D5\nsayan1\n\x0D3\nso")
+        self.assertIsNone(protocol.parse())
+        protocol._reset()
+        self.assertEqual(protocol.bytes_needed(), 0)
+        protocol.push_additional_bytes(b"\x112\n\x0D5\nsayan\x0525\n")
+        self.assertEqual(protocol.parse().row(), ("sayan", 25))
+
+    def test_lazy(self):
+        protocol = Protocol(
+            b"\x132\n4\n\x0D5\nsayan\x0C5\ncakes\x06-255\n\x0B3.05\n4\n\x0D6\nsophie\x0C7\ncookies\x02255\n\x0A-1.5\n",
+            lazy=True)
+        (first, second) = protocol.parse().rows()
+        self.assertIsNotNone(first.columns[0]._buffer)
+        self.assertEqual(first.columns[0].string(), "sayan")
+        self.assertIsNone(first.columns[0]._buffer)
+        self.assertEqual(first, Row([Value("sayan"), Value(b"cakes"), Value(SInt8(-255)), Value(Float64(3.05))]))
+        self.assertEqual(second, Row([Value("sophie"), Value(b"cookies"), Value(UInt8(255)), Value(Float32(-1.5))]))
+        self.assertEqual(second.columns[2].repr, UInt8(255))
+
+    def test_lazy_buffer_retained(self):
+        protocol = Protocol(lazy=True)
+        protocol.push_additional_bytes(b"\x111\n\x0D5\nsayan\x111\n\x0D6\nsop")
+        buffer = protocol._buffer
+        snapshot = bytes(buffer)
+        row = protocol.parse().row()
+        protocol.push_additional_bytes(b"hie")
+        # the buffer that the first row points into is left untouched
+        self.assertTrue(protocol._buffer is not buffer)
+        self.assertTrue(bytes(buffer) == snapshot)
+        self.assertEqual(protocol.parse().row(), Row([Value("sophie")]))
+        self.assertEqual(row, Row([Value("sayan")]))
+
+    def test_lazy_invalid_number(self):
+        value = Protocol(b"\x0212a\n", lazy=True).parse_next_element()
+        with self.assertRaises(ProtocolException):
+            value.int()
@@ -14,7 +14,8 @@
 # limitations under the License.
 
 import unittest
-from src.skytable_py.query import Query, UInt
+from src.skytable_py.query import Query, Pipeline, UInt
+from src.skytable_py.exception import ClientException
 
 
 class QueryTest(unittest.TestCase):
@@ -26,3 +27,47 @@ class QueryTest(unittest.TestCase):
             "insert into db.db { name: ?, random_num: ? }", "sayan", UInt(300))._buffer
         self.assertEqual(
             blob, b"insert into db.db { name: ?, random_num: ? }\x065\nsayan\x02300\n")
+
+    def test_add_param(self):
+        query = Query("insert into db.db(?, ?)")
+        query.add_param("sayan")
+        query.add_param(UInt(300))
+        self.assertEqual(query.get_param_count(), 2)
+        self.assertEqual(query._buffer, b"insert into db.db(?, ?)\x065\nsayan\x02300\n")
+
+
+class PreparedQueryTest(unittest.TestCase):
+    def test_bind(self):
+        template = Query.template("insert into db.db { name: ?, random_num: ? }")
+        for name, num in [("sayan", 300), ("sophie", 400)]:
+            query = template.bind(name, UInt(num))
+            expected = Query("insert into db.db { name: ?, random_num: ? }", name, UInt(num))
+            self.assertEqual(query._buffer, expected._buffer)
+            self.assertEqual(query._q_window, expected._q_window)
+            self.assertEqual(query.get_param_count(), 2)
+
+    def test_bind_does_not_modify_template(self):
+        template = Query.template("select * from db.db where name = ?")
+        template.bind("sayan")
+        self.assertEqual(template.bind("sophie")._buffer, b"select * from db.db where name = ?\x066\nsophie")
+
+    def test_check_params(self):
+        template = Query.template("insert into db.db(?, ?)", check_params=True)
+        self.assertEqual(template.get_expected_param_count(), 2)
+        template.bind("sayan", "password")
+        with self.assertRaises(ClientException):
+            template.bind("sayan")
+        # not checked by default
+        Query.template("insert into db.db(?, ?)").bind("sayan")
+
+
+class PipelineTest(unittest.TestCase):
+    def test_query_count(self):
+        self.assertEqual(Pipeline().get_query_count(), 0)
+        self.assertEqual(Pipeline(Query("use $current"), Query("sysctl report status")).get_query_count(), 2)
+
+    def test_encode_pipeline(self):
+        pipeline = Pipeline(Query("select * from db.db where name = ?", "sayan"), Query("sysctl report status"))
+        self.assertEqual(
+            bytes(pipeline._buffer),
+            b"34\n8\nselect * from db.db where name = ?\x065\nsayan20\n0\nsysctl report status")
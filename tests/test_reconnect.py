@@ -0,0 +1,123 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from src.skytable_py import Query
+from src.skytable_py.emulator import Emulator, encode_row, encode_value
+from src.skytable_py.rows import tuple_row
+
+
+def dropping(drops: int):
+    # close the connection instead of answering the first `drops` queries
+    calls = []
+
+    def handler(query: bytes) -> bytes:
+        calls.append(query)
+        if len(calls) <= drops:
+            raise ConnectionResetError()
+        return encode_row(["sayan"])
+    return handler
+
+
+class ReconnectTest(unittest.IsolatedAsyncioTestCase):
+    async def connect(self, drops: int, **kwargs):
+        self.server = await Emulator(dropping(drops)).start()
+        self.addAsyncCleanup(self.server.stop)
+        db = await self.server.config().connect_reconnecting(base_delay=0.01, **kwargs)
+        self.addAsyncCleanup(db.close)
+        return db
+
+    async def test_idempotent_retried(self):
+        db = await self.connect(drops=2)
+        db.set_row_factory(tuple_row)
+        resp = await db.run_simple_query(Query("select * from apps.auth"), idempotent=True)
+        # settings survive reconnecting
+        self.assertEqual(resp.row(), ("sayan",))
+        self.assertEqual(db.reconnects, 2)
+        self.assertEqual(self.server.handshakes, 3)
+
+    async def test_not_idempotent(self):
+        db = await self.connect(drops=1)
+        with self.assertRaises(ConnectionError):
+            await db.run_simple_query(Query("update apps.auth set password = ?", "x"))
+        resp = await db.run_simple_query(Query("select * from apps.auth"))
+        self.assertEqual(resp.row().columns[0].string(), "sayan")
+        self.assertEqual(db.reconnects, 1)
+
+    async def test_retries_exhausted(self):
+        db = await self.connect(drops=10, max_retries=2)
+        with self.assertRaises(ConnectionError):
+            await db.run_pipeline([Query("select * from apps.auth")], idempotent=True)
+        self.assertEqual(self.server.handshakes, 3)
+
+    async def test_cancelled_query(self):
+        self.server = await Emulator(lambda query: encode_value(query.decode()), latency=0.1).start()
+        self.addAsyncCleanup(self.server.stop)
+        db = await self.server.config().connect_reconnecting(base_delay=0.01)
+        self.addAsyncCleanup(db.close)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(db.run_simple_query(Query("select 1"), idempotent=True), 0.05)
+        # the response to the cancelled query isn't taken for the next one
+        resp = await db.run_simple_query(Query("select 2"))
+        self.assertEqual(resp.value().string(), "select 2")
+        self.assertEqual(db.reconnects, 1)
+
+    async def test_server_restart(self):
+        db = await self.connect(drops=0, max_retries=10, max_delay=0.05)
+        port = self.server.port
+        await self.server.stop()
+        with self.assertRaises(ConnectionError):
+            await db.run_simple_query(Query("select * from apps.auth"))
+
+        async def restart():
+            await asyncio.sleep(0.1)
+            self.server = await Emulator(lambda query: encode_value("back"), port=port).start()
+            self.addAsyncCleanup(self.server.stop)
+
+        restarting = asyncio.ensure_future(restart())
+        resp = await db.run_simple_query(Query("select * from apps.auth"), idempotent=True)
+        await restarting
+        self.assertEqual(resp.value().string(), "back")
+
+
+    async def test_handshake_dropped(self):
+        db = await self.connect(drops=0, max_retries=10, max_delay=0.05)
+        port = self.server.port
+        await self.server.stop()
+        with self.assertRaises(ConnectionError):
+            await db.run_simple_query(Query("select * from apps.auth"))
+
+        # the instance accepts connections but closes them during the handshake until it is back
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            await reader.read(1024)
+            writer.close()
+
+        restarting = await asyncio.start_server(handle, "127.0.0.1", port)
+
+        async def restart():
+            await asyncio.sleep(0.1)
+            restarting.close()
+            await restarting.wait_closed()
+            self.server = await Emulator(lambda query: encode_value("back"), port=port).start()
+            self.addAsyncCleanup(self.server.stop)
+
+        restarted = asyncio.ensure_future(restart())
+        resp = await db.run_simple_query(Query("select * from apps.auth"), idempotent=True)
+        await restarted
+        self.assertEqual(resp.value().string(), "back")
+
+if __name__ == '__main__':
+    unittest.main()
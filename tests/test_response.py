@@ -14,6 +14,7 @@
 # limitations under the License.
 
 import unittest
+from src.skytable_py.exception import ClientException
 from src.skytable_py.protocol import Protocol
 from src.skytable_py.response import Response, Value, UInt8, UInt16, UInt32, UInt64, SInt8, SInt16, SInt32, SInt64, Float32, Float64, ErrorCode, Row, Empty
 
@@ -80,3 +81,52 @@ class ProtocolTest(unittest.TestCase):
         self.assertEquals(Response([Row([Value("sayan"), Value(b"cakes")]), Row(
             [Value("sophie"), Value(b"cookies")])]).rows(), [Row([Value("sayan"), Value(b"cakes")]), Row(
                 [Value("sophie"), Value(b"cookies")])])
+
+    def test_value_accessors(self):
+        value = Value(SInt16(-1))
+        self.assertFalse(hasattr(value, "__dict__"))
+        self.assertEqual(value.int(), -1)
+        self.assertEqual(value.data(), -1)
+        self.assertIsNone(value.float())
+        self.assertIsNone(value.string())
+        self.assertEqual(value.repr, SInt16(-1))
+        self.assertEqual(Value(Float32(1.5)).float(), 1.5)
+        self.assertIsNone(Value(Float32(1.5)).int())
+        self.assertEqual(Value(b"bytes").binary(), b"bytes")
+        self.assertEqual(Value([]).list(), [])
+        self.assertIsNone(Value(True).int())
+        self.assertTrue(Value(None).is_null())
+        value.repr = "string"
+        self.assertEqual(value.string(), "string")
+        other = Value({})
+        self.assertEqual(other.repr, {})
+        with self.assertRaises(ClientException):
+            other.data()
+
+    def test_repr_wrapper_is_kept(self):
+        value = Value(UInt8(1))
+        value.repr.inner = 2
+        self.assertEqual(value.int(), 2)
+        self.assertEqual(value.data(), 2)
+        decoded = Protocol(b"\x057\n").parse_next_element()
+        self.assertIs(decoded.repr, decoded.repr)
+        decoded.repr.inner = 8
+        self.assertEqual(decoded.int(), 8)
+        self.assertEqual(decoded, Value(UInt64(8)))
+
+    def test_subclasses(self):
+        class Text(str):
+            pass
+
+        class Rows(list):
+            pass
+
+        self.assertEqual(Value(Text("text")).string(), "text")
+        rows = Rows([Row([Value(True)])])
+        self.assertIs(Response(rows).rows(), rows)
+        response = Response(("not", "a", "response"))
+        self.assertIsNone(response.value())
+        self.assertIsNone(response.rows())
+        self.assertFalse(response.is_empty())
+        response.data = Empty()
+        self.assertTrue(response.is_empty())
@@ -0,0 +1,80 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from src.skytable_py import Config, Query, Pipeline
+from src.skytable_py.response import Value, Row
+from src.skytable_py.emulator import Emulator
+
+
+def respond(query: bytes) -> bytes:
+    if query.startswith(b"select"):
+        return b"\x111\n\x0D5\nsayan"
+    elif query.startswith(b"blob"):
+        return b"\x0C1000000\n" + b"x" * 1_000_000
+    return b"\x10\x05\x00"
+
+
+class SyncConnectionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await Emulator(respond).start()
+        self.config = Config("root", "password", port=self.server.port)
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def run_sync(self, f):
+        # the mock server runs on this event loop, so the blocking client has to run on another thread
+        return await asyncio.get_event_loop().run_in_executor(None, f)
+
+    async def test_simple_query(self):
+        def run():
+            with self.config.connect_sync(timeout=5) as db:
+                return db.run_simple_query(Query("select * from apps.auth where username = ?", "sayan"))
+
+        self.assertEqual((await self.run_sync(run)).row(), Row([Value("sayan")]))
+        self.assertEqual(self.server.handshakes, 1)
+
+    async def test_large_response(self):
+        def run():
+            with self.config.connect_sync(timeout=5) as db:
+                return db.run_simple_query(Query("blob"))
+
+        self.assertEqual((await self.run_sync(run)).value(), Value(b"x" * 1_000_000))
+
+    async def test_read_blob_into(self):
+        sink = bytearray(1_000_000)
+
+        def run():
+            with self.config.connect_sync(timeout=5) as db:
+                return db.read_blob_into(Query("blob"), sink)
+
+        self.assertEqual(await self.run_sync(run), 1_000_000)
+        self.assertEqual(sink, b"x" * 1_000_000)
+
+    async def test_pipeline(self):
+        def run():
+            with self.config.connect_sync(timeout=5) as db:
+                return db.run_pipeline(Pipeline(Query("select"), Query("delete"), Query("select")))
+
+        first, error, last = await self.run_sync(run)
+        self.assertEqual(first.row(), Row([Value("sayan")]))
+        self.assertEqual(error.error(), 5)
+        self.assertEqual(last.row(), Row([Value("sayan")]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+# Copyright 2024, Sayan Nandan <nandansayan@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from src.skytable_py import BufferedConnection, Config, Query, Pipeline
+from src.skytable_py.emulator import Emulator, encode_row, encode_rows, encode_value
+from src.skytable_py.exception import ClientException
+from src.skytable_py.response import Value, Row
+
+_BLOB = bytes(range(256)) * 4000
+_MANY_ROWS = encode_rows([[f"user{i}".ljust(64, "-"), i] for i in range(20_000)])
+
+
+def respond(query: bytes) -> bytes:
+    if query.startswith(b"select all * from apps.many"):
+        return _MANY_ROWS
+    elif query.startswith(b"select all"):
+        return encode_rows([[f"user{i}", i] for i in range(1000)])
+    elif query.startswith(b"select blob"):
+        return encode_value(_BLOB)
+    elif query.startswith(b"select"):
+        return encode_row(["sayan"])
+    raise ConnectionResetError()
+
+
+class BufferedTransportTest(unittest.IsolatedAsyncioTestCase):
+    async def connect(self, chunk_size=None) -> BufferedConnection:
+        self.server = await Emulator(respond, chunk_size=chunk_size).start()
+        self.addAsyncCleanup(self.server.stop)
+        db = await self.server.config(transport="buffered").connect()
+        self.addAsyncCleanup(db.close)
+        return db
+
+    async def test_simple_query(self):
+        db = await self.connect()
+        self.assertIsInstance(db, BufferedConnection)
+        resp = await db.run_simple_query(Query("select * from apps.auth"))
+        self.assertEqual(resp.row(), Row([Value("sayan")]))
+        self.assertEqual(self.server.handshakes, 1)
+
+    async def test_fragmented_responses(self):
+        db = await self.connect(chunk_size=64)
+        rows = (await db.run_simple_query(Query("select all * from apps.users limit ?", "1000"))).rows()
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual(rows[999].columns[0].string(), "user999")
+        resps = await db.run_pipeline([Query("select * from apps.auth"), Query("select blob from apps.blobs")])
+        self.assertEqual(resps[0].row(), Row([Value("sayan")]))
+        self.assertEqual(resps[1].value(), Value(_BLOB))
+
+    async def test_large_blob_single_wakeup(self):
+        db = await self.connect(chunk_size=4096)
+        waits = 0
+        wait_for_data = db._reader._wait_for_data
+
+        async def counted():
+            nonlocal waits
+            waits += 1
+            await wait_for_data()
+        db._reader._wait_for_data = counted
+        sink = bytearray(len(_BLOB))
+        self.assertEqual(await db.read_blob_into(Query("select blob from apps.blobs"), sink), len(_BLOB))
+        self.assertEqual(sink, _BLOB)
+        # the connection isn't woken up for every chunk of the blob
+        self.assertLess(waits, 10)
+
+    async def test_stream_rows_slow_consumer(self):
+        db = await self.connect()
+        count = 0
+        peak = 0
+        query = Query("select all * from apps.many limit ?", "20000")
+        async for row in db.stream_rows(query):
+            if count == 0:
+                # the rest of the response arrives while the consumer is busy
+                await asyncio.sleep(0.2)
+            elif count % 100 == 0:
+                await asyncio.sleep(0)
+            count += 1
+            peak = max(peak, len(db._protocol._buffer))
+        self.assertEqual(count, 20_000)
+        # reading is paused instead of buffering the whole response
+        self.assertLess(peak, 1 << 20)
+        self.assertGreater(len(_MANY_ROWS), 2 * peak)
+
+    async def test_fetch_columns(self):
+        db = await self.connect(chunk_size=1000)
+        columns = await db.fetch_columns(Query("select all * from apps.many limit ?", "20000"))
+        self.assertEqual(columns.get_row_count(), 20_000)
+        self.assertEqual(columns.column(0)[19_999], "user19999".ljust(64, "-"))
+
+    async def test_multiplexed(self):
+        self.server = await Emulator(respond, latency=0.01).start()
+        self.addAsyncCleanup(self.server.stop)
+        db = await self.server.config(transport="buffered").connect_multiplexed()
+        self.addAsyncCleanup(db.close)
+        resps = await asyncio.gather(*(db.run_simple_query(Query("select * from apps.auth")) for _ in range(20)))
+        self.assertTrue(all(resp.row() == Row([Value("sayan")]) for resp in resps))
+
+    async def test_connection_closed(self):
+        db = await self.connect()
+        with self.assertRaises(ConnectionError):
+            await db.run_simple_query(Query("drop space apps"))
+        self.assertTrue(db.is_closed())
+
+    async def test_reconnecting(self):
+        calls = []
+
+        def dropping(query: bytes) -> bytes:
+            calls.append(query)
+            if len(calls) == 1:
+                raise ConnectionResetError()
+            return encode_row(["sayan"])
+        self.server = await Emulator(dropping).start()
+        self.addAsyncCleanup(self.server.stop)
+        db = await self.server.config(transport="buffered").connect_reconnecting(base_delay=0.01)
+        self.addAsyncCleanup(db.close)
+        resp = await db.run_simple_query(Query("select * from apps.auth"), idempotent=True)
+        self.assertEqual(resp.row(), Row([Value("sayan")]))
+        self.assertEqual(db.reconnects, 1)
+
+    def test_unknown_transport(self):
+        with self.assertRaises(ClientException):
+            Config("root", "password", transport="uvloop")
+
+
+if __name__ == '__main__':
+    unittest.main()